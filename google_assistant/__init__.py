@@ -30,12 +30,14 @@ from .const import (
     CONF_SECURE_DEVICES_PIN,
     CONF_SERVICE_ACCOUNT,
     CONF_SOFTWARE_VERSION,
+    CONF_SYNC_DELAY,
     DEFAULT_EXPOSE_BY_DEFAULT,
     DEFAULT_EXPOSED_DOMAINS,
     DOMAIN,
     SERVICE_REQUEST_SYNC,
 )
 from .const import EVENT_QUERY_RECEIVED  # noqa: F401
+from .helpers import SYNC_DELAY
 from .http import GoogleAssistantView, GoogleConfig
 
 from .const import EVENT_COMMAND_RECEIVED, EVENT_SYNC_RECEIVED  # noqa: F401, isort:skip
@@ -89,6 +91,7 @@ GOOGLE_ASSISTANT_SCHEMA = vol.All(
             vol.Optional(CONF_SECURE_DEVICES_PIN): str,
             vol.Optional(CONF_REPORT_STATE, default=False): cv.boolean,
             vol.Optional(CONF_SERVICE_ACCOUNT): GOOGLE_SERVICE_ACCOUNT,
+            vol.Optional(CONF_SYNC_DELAY, default=SYNC_DELAY): cv.positive_int,
         },
         extra=vol.PREVENT_EXTRA,
     ),
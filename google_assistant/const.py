@@ -44,6 +44,7 @@ CONF_ROOM_HINT = "room"
 CONF_SECURE_DEVICES_PIN = "secure_devices_pin"
 CONF_SERVICE_ACCOUNT = "service_account"
 CONF_SOFTWARE_VERSION = "software_version"
+CONF_SYNC_DELAY = "sync_delay"
 
 DEFAULT_EXPOSE_BY_DEFAULT = True
 DEFAULT_EXPOSED_DOMAINS = [
@@ -3,27 +3,43 @@
 """Helper classes for Google Assistant integration."""
 from abc import ABC, abstractmethod
 from asyncio import gather
+from bisect import bisect_left
+from collections import namedtuple
 from collections.abc import Mapping
+from functools import lru_cache
 import logging
 import pprint
+from time import monotonic, perf_counter
 from typing import List, Optional
 
-from aiohttp.web import json_response
+from aiohttp.web import Response
 
 from homeassistant.components import webhook
 from homeassistant.const import (
     ATTR_DEVICE_CLASS,
+    ATTR_ENTITY_ID,
     ATTR_SUPPORTED_FEATURES,
     CLOUD_NEVER_EXPOSED_ENTITIES,
+    CONTENT_TYPE_JSON,
     CONF_NAME,
+    EVENT_HOMEASSISTANT_STARTED,
+    MATCH_ALL,
     STATE_UNAVAILABLE,
 )
-from homeassistant.core import Context, HomeAssistant, State, callback
-from homeassistant.helpers.event import async_call_later
+from homeassistant.core import Context, CoreState, HomeAssistant, State, callback
+from homeassistant.helpers.area_registry import EVENT_AREA_REGISTRY_UPDATED
+from homeassistant.helpers.device_registry import EVENT_DEVICE_REGISTRY_UPDATED
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_added_domain,
+    async_track_state_change_event,
+    async_track_state_removed_domain,
+)
 from homeassistant.helpers.network import get_url
 from homeassistant.helpers.storage import Store
 
-from . import trait
+from . import local_sdk, trait
 from .const import (
     CONF_ALIASES,
     CONF_HARDWARE_VERSION,
@@ -44,6 +60,34 @@ from .error import SmartHomeError
 SYNC_DELAY = 15
 _LOGGER = logging.getLogger(__name__)
 
+# Services that can safely be called again for entities they already ran on,
+# only these are batched since a failed batch is retried entity by entity
+BATCHED_SERVICES = {
+    "close_cover",
+    "open_cover",
+    "select_option",
+    "set_cover_position",
+    "set_fan_mode",
+    "set_humidity",
+    "set_hvac_mode",
+    "set_speed",
+    "set_temperature",
+    "turn_off",
+    "turn_on",
+    "volume_mute",
+    "volume_set",
+}
+# Domains whose turn_on starts something, calling it twice runs it twice
+UNBATCHED_DOMAINS = {"scene", "script"}
+
+# Upper bounds of the request latency buckets
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+# Log the latency histogram of an intent every this many requests
+LATENCY_LOG_INTERVAL = 100
+
+SyncInfo = namedtuple("SyncInfo", ("instance_uuid", "room_hints"))
+SyncInfo.__doc__ += """ Data shared by the devices of a SYNC response."""
+
 
 class AbstractConfig(ABC):
     """Hold the configuration for Google Assistant."""
@@ -54,8 +98,12 @@ class AbstractConfig(ABC):
         """Initialize abstract config."""
         self.hass = hass
         self._store = None
-        self._google_sync_unsub = {}
+        self._sync_coalescer = SyncCoalescer(hass, self)
         self._local_sdk_active = False
+        self._entities = {}
+        self._exposure_index = ExposureIndex(hass, self)
+        self._sync_cache = SyncCache(hass, self)
+        self.latency = {}
 
     async def async_initialize(self):
         """Perform async initialization of config."""
@@ -77,6 +125,16 @@ class AbstractConfig(ABC):
         """Return entity config."""
         return None
 
+    @property
+    def sync_delay(self):
+        """Return the seconds to wait for further changes before a sync."""
+        return SYNC_DELAY
+
+    @property
+    def agent_user_ids(self):
+        """Return the agent user ids that have synced with Google."""
+        return self._store.agent_user_ids
+
     @property
     def is_reporting_state(self):
         """Return if we're actively reporting states."""
@@ -119,7 +177,10 @@ class AbstractConfig(ABC):
         return True
 
     async def async_report_state(self, message, agent_user_id: str):
-        """Send a state report to Google."""
+        """Send a state report to Google.
+
+        Returns the HTTP status of the request, if known.
+        """
         raise NotImplementedError
 
     async def async_report_state_all(self, message):
@@ -147,10 +208,83 @@ class AbstractConfig(ABC):
             self._unsub_report_state()
             self._unsub_report_state = None
 
+    @callback
+    def async_get_exposed_entity_ids(self):
+        """Return the set of entity ids exposed to Google."""
+        return self._exposure_index.async_get()
+
+    @callback
+    def async_track_exposure(self, action):
+        """Call action with an entity id and if it is exposed when that changes."""
+        return self._exposure_index.async_add_listener(action)
+
+    @callback
+    def async_invalidate_exposure(self):
+        """Re-evaluate which entities are exposed after a config change.
+
+        Configs whose entity config or exposure settings change at runtime
+        call this after the change.
+        """
+        self._exposure_index.async_invalidate()
+        self._sync_cache.async_invalidate()
+
+    @callback
+    def async_get_sync_devices(self, agent_user_id):
+        """Return the cached devices of a SYNC response, if still valid."""
+        return self._sync_cache.async_get(agent_user_id)
+
+    @callback
+    def async_set_sync_devices(self, agent_user_id, devices):
+        """Cache the devices of a SYNC response."""
+        self._sync_cache.async_set(agent_user_id, devices)
+
+    @callback
+    def async_get_local_response(self, key):
+        """Return a cached serialized local SDK payload, if still valid."""
+        return self._sync_cache.async_get(("local", *key))
+
+    @callback
+    def async_set_local_response(self, key, payload: bytes):
+        """Cache a serialized local SDK payload."""
+        self._sync_cache.async_set(("local", *key), payload)
+
+    @callback
+    def async_record_latency(self, source, intent, seconds):
+        """Record the time it took to handle a request."""
+        histogram = self.latency.get((source, intent))
+        if histogram is None:
+            histogram = self.latency[(source, intent)] = LatencyHistogram()
+        histogram.observe(seconds)
+
+        if histogram.count % LATENCY_LOG_INTERVAL == 0:
+            _LOGGER.debug(
+                "Latency of %s %s requests: %s", source, intent, histogram.as_dict()
+            )
+
+    @callback
+    def async_get_entity(self, state):
+        """Return the GoogleEntity of a state, reusing the one of its entity."""
+        entity = self._entities.get(state.entity_id)
+        if entity is None:
+            entity = self._entities[state.entity_id] = GoogleEntity(
+                self.hass, self, state
+            )
+        elif entity.state is not state:
+            entity.async_set_state(state)
+        return entity
+
+    @callback
+    def async_prune_entities(self, entity_ids):
+        """Forget the GoogleEntity objects of entities not in entity_ids."""
+        for entity_id in self._entities.keys() - entity_ids:
+            del self._entities[entity_id]
+
     async def async_sync_entities(self, agent_user_id: str):
         """Sync all entities to Google."""
         # Remove any pending sync
-        self._google_sync_unsub.pop(agent_user_id, lambda: None)()
+        self._sync_coalescer.async_record_sync(agent_user_id)
+        # Google answers a request sync with a SYNC, which has to be fresh
+        self._sync_cache.async_invalidate()
         return await self._async_request_sync_devices(agent_user_id)
 
     async def async_sync_entities_all(self):
@@ -166,16 +300,7 @@ class AbstractConfig(ABC):
     @callback
     def async_schedule_google_sync(self, agent_user_id: str):
         """Schedule a sync."""
-        async def _schedule_callback(_now):
-            """Handle a scheduled sync callback."""
-            self._google_sync_unsub.pop(agent_user_id, None)
-            await self.async_sync_entities(agent_user_id)
-
-        self._google_sync_unsub.pop(agent_user_id, lambda: None)()
-
-        self._google_sync_unsub[agent_user_id] = async_call_later(
-            self.hass, SYNC_DELAY, _schedule_callback
-        )
+        self._sync_coalescer.async_schedule(agent_user_id)
 
     @callback
     def async_schedule_google_sync_all(self):
@@ -221,6 +346,7 @@ class AbstractConfig(ABC):
         )
 
         self._local_sdk_active = True
+        self._sync_cache.async_invalidate()
 
     @callback
     def async_disable_local_sdk(self):
@@ -230,6 +356,7 @@ class AbstractConfig(ABC):
 
         webhook.async_unregister(self.hass, self.local_sdk_webhook_id)
         self._local_sdk_active = False
+        self._sync_cache.async_invalidate()
 
     async def _handle_local_webhook(self, hass, webhook_id, request):
         """Handle an incoming local SDK message."""
@@ -237,13 +364,28 @@ class AbstractConfig(ABC):
         # pylint: disable=import-outside-toplevel
         from . import smart_home
 
-        payload = await request.json()
+        start = perf_counter()
+        payload = local_sdk.json_loads(await request.read())
 
         if _LOGGER.isEnabledFor(logging.DEBUG):
             _LOGGER.debug("Received local message:\n%s\n", pprint.pformat(payload))
 
         if not self.enabled:
-            return json_response(smart_home.turned_off_response(payload))
+            return Response(
+                body=local_sdk.json_dumps(smart_home.turned_off_response(payload)),
+                content_type=CONTENT_TYPE_JSON,
+            )
+
+        key = local_sdk.response_cache_key(payload)
+        cached = None if key is None else self.async_get_local_response(key)
+
+        if cached is not None:
+            body = local_sdk.render_response(payload.get("requestId"), cached)
+            self.async_record_latency(
+                SOURCE_LOCAL, local_sdk.get_intent(payload), perf_counter() - start
+            )
+            _LOGGER.debug("Responding to local message from cache:\n%s\n", body)
+            return Response(body=body, content_type=CONTENT_TYPE_JSON)
 
         result = await smart_home.async_handle_message(
             self.hass, self, self.local_sdk_user_id, payload, SOURCE_LOCAL
@@ -252,7 +394,382 @@ class AbstractConfig(ABC):
         if _LOGGER.isEnabledFor(logging.DEBUG):
             _LOGGER.debug("Responding to local message:\n%s\n", pprint.pformat(result))
 
-        return json_response(result)
+        if key is not None and "errorCode" not in result["payload"]:
+            self.async_set_local_response(key, local_sdk.json_dumps(result["payload"]))
+
+        return Response(
+            body=local_sdk.json_dumps(result), content_type=CONTENT_TYPE_JSON
+        )
+
+
+class LatencyHistogram:
+    """Count request latencies in buckets of LATENCY_BUCKETS_MS."""
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, seconds):
+        """Add a latency to the histogram."""
+        millis = seconds * 1000
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, millis)] += 1
+        self.count += 1
+        self.total_ms += millis
+
+    def as_dict(self):
+        """Return the histogram as a dict."""
+        buckets = {
+            f"le_{bound}ms": count
+            for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)
+        }
+        buckets["inf"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "buckets": buckets,
+        }
+
+
+class ExposureIndex:
+    """Keep track of the entity ids exposed to Google.
+
+    Exposure is evaluated when an entity is added and when its entity
+    registry entry changes. All entities are evaluated again when the config
+    invalidates the index after a change of its exposure settings. Listeners
+    are told about every entity that becomes or stops being exposed.
+    """
+
+    def __init__(self, hass: HomeAssistant, config: AbstractConfig):
+        """Initialize the exposure index."""
+        self.hass = hass
+        self._config = config
+        self._entity_ids = None
+        self._unsubs = []
+        self._listeners = []
+
+    @callback
+    def async_get(self):
+        """Return the exposed entity ids, building the index if needed."""
+        if self._entity_ids is None:
+            self._entity_ids = {
+                state.entity_id
+                for state in self.hass.states.async_all()
+                if self._async_is_exposed(state)
+            }
+        if not self._unsubs:
+            self._unsubs = [
+                async_track_state_added_domain(
+                    self.hass, MATCH_ALL, self._async_handle_state_changed
+                ),
+                async_track_state_removed_domain(
+                    self.hass, MATCH_ALL, self._async_handle_state_changed
+                ),
+                self.hass.bus.async_listen(
+                    EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_registry_updated
+                ),
+            ]
+        return self._entity_ids
+
+    @callback
+    def async_add_listener(self, action):
+        """Call action with an entity id and if it is exposed when that changes."""
+        self._listeners.append(action)
+
+        @callback
+        def remove_listener():
+            """Stop calling action."""
+            self._listeners.remove(action)
+
+        return remove_listener
+
+    @callback
+    def async_invalidate(self):
+        """Evaluate the exposure of all entities again."""
+        if self._entity_ids is None:
+            return
+        old_entity_ids = self._entity_ids
+        self._entity_ids = None
+        if not self._listeners:
+            return
+
+        entity_ids = self.async_get()
+        for entity_id in entity_ids - old_entity_ids:
+            self._async_notify(entity_id, True)
+        for entity_id in old_entity_ids - entity_ids:
+            self._async_notify(entity_id, False)
+
+    @callback
+    def _async_is_exposed(self, state):
+        """Return if a state should be exposed."""
+        return state.entity_id not in CLOUD_NEVER_EXPOSED_ENTITIES and bool(
+            self._config.should_expose(state)
+        )
+
+    @callback
+    def _async_handle_state_changed(self, event):
+        """Update the index for an added or removed entity."""
+        self._async_update(event.data[ATTR_ENTITY_ID], event.data.get("new_state"))
+
+    @callback
+    def _async_handle_registry_updated(self, event):
+        """Update the index for an entity whose registry entry changed."""
+        old_entity_id = event.data.get("old_entity_id")
+        if old_entity_id is not None:
+            self._async_update(old_entity_id, self.hass.states.get(old_entity_id))
+        entity_id = event.data[ATTR_ENTITY_ID]
+        self._async_update(entity_id, self.hass.states.get(entity_id))
+
+    @callback
+    def _async_update(self, entity_id, state):
+        """Evaluate the exposure of one entity."""
+        if self._entity_ids is None:
+            return
+        exposed = state is not None and self._async_is_exposed(state)
+        if exposed == (entity_id in self._entity_ids):
+            return
+        if exposed:
+            self._entity_ids.add(entity_id)
+        else:
+            self._entity_ids.discard(entity_id)
+        self._async_notify(entity_id, exposed)
+
+    @callback
+    def _async_notify(self, entity_id, exposed):
+        """Tell the listeners about a change of exposure."""
+        for action in list(self._listeners):
+            action(entity_id, exposed)
+
+
+class SyncCoalescer:
+    """Coalesce scheduled syncs of all agent users.
+
+    Scheduled syncs are held until Home Assistant has started and until no
+    further sync was scheduled for the quiet period of the config. An agent
+    user is synced at most once per quiet period, scheduled syncs that fall
+    within it are merged into the pending one.
+    """
+
+    def __init__(self, hass: HomeAssistant, config: AbstractConfig):
+        """Initialize the sync coalescer."""
+        self.hass = hass
+        self._config = config
+        self._pending = set()
+        self._last_sync = {}
+        self._unsub_flush = None
+        self._unsub_started = None
+        self.scheduled = 0
+        self.requested = 0
+
+    @property
+    def avoided(self):
+        """Return the number of scheduled syncs merged into other syncs."""
+        return self.scheduled - self.requested - len(self._pending)
+
+    @callback
+    def async_schedule(self, agent_user_id):
+        """Schedule a sync of an agent user."""
+        self.scheduled += 1
+        self._pending.add(agent_user_id)
+
+        if self.hass.state != CoreState.running:
+            if self._unsub_started is None:
+                self._unsub_started = self.hass.bus.async_listen_once(
+                    EVENT_HOMEASSISTANT_STARTED, self._async_handle_started
+                )
+            return
+
+        self._async_schedule_flush(self._config.sync_delay)
+
+    @callback
+    def async_record_sync(self, agent_user_id):
+        """Record a sync of an agent user, it covers its scheduled sync."""
+        self._pending.discard(agent_user_id)
+        self._last_sync[agent_user_id] = monotonic()
+        if not self._pending and self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @callback
+    def _async_handle_started(self, _event):
+        """Start the quiet period for syncs held during startup."""
+        self._unsub_started = None
+        if self._pending:
+            self._async_schedule_flush(self._config.sync_delay)
+
+    @callback
+    def _async_schedule_flush(self, delay):
+        """(Re)start the timer for the pending syncs."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+        self._unsub_flush = async_call_later(self.hass, delay, self._async_flush)
+
+    async def _async_flush(self, _now):
+        """Sync the pending agent users that were not synced too recently."""
+        self._unsub_flush = None
+        sync_delay = self._config.sync_delay
+        now = monotonic()
+        due = []
+        wait = None
+        for agent_user_id in self._pending:
+            last_sync = self._last_sync.get(agent_user_id)
+            remaining = 0 if last_sync is None else last_sync + sync_delay - now
+            if remaining <= 0:
+                due.append(agent_user_id)
+            else:
+                wait = remaining if wait is None else min(wait, remaining)
+
+        self._pending.difference_update(due)
+        if wait is not None:
+            self._async_schedule_flush(wait)
+
+        if not due:
+            return
+
+        self.requested += len(due)
+        _LOGGER.debug(
+            "Requesting sync for %d agent users, %d scheduled syncs avoided",
+            len(due),
+            self.avoided,
+        )
+        await gather(
+            *[self._config.async_sync_entities(agent_user_id) for agent_user_id in due]
+        )
+
+
+class SyncCache:
+    """Cache responses built from the exposed devices.
+
+    Holds the devices of SYNC responses per agent user and the serialized
+    local SDK responses. The cache is dropped when the registries change,
+    when entities become exposed or unexposed and when a state change of an
+    exposed entity changes what a SYNC response is built from.
+    """
+
+    def __init__(self, hass: HomeAssistant, config: AbstractConfig):
+        """Initialize the SYNC cache."""
+        self.hass = hass
+        self._config = config
+        self._responses = {}
+        self._unsubs = []
+        self._unsub_states = {}
+
+    @callback
+    def async_get(self, key):
+        """Return a cached response."""
+        return self._responses.get(key)
+
+    @callback
+    def async_set(self, key, response):
+        """Cache a response."""
+        self._responses[key] = response
+        if self._unsubs:
+            return
+        for event_type in (
+            EVENT_AREA_REGISTRY_UPDATED,
+            EVENT_DEVICE_REGISTRY_UPDATED,
+            EVENT_ENTITY_REGISTRY_UPDATED,
+        ):
+            self._unsubs.append(
+                self.hass.bus.async_listen(event_type, self._async_invalidate_event)
+            )
+        self._unsubs.append(
+            self._config.async_track_exposure(self._async_handle_exposure_changed)
+        )
+        for entity_id in self._config.async_get_exposed_entity_ids():
+            self._async_track_state(entity_id)
+
+    @callback
+    def async_invalidate(self):
+        """Drop all cached responses."""
+        self._responses.clear()
+
+    @callback
+    def _async_invalidate_event(self, event):
+        """Drop all cached responses after a relevant change."""
+        self.async_invalidate()
+
+    @callback
+    def _async_track_state(self, entity_id):
+        """Follow the state changes of an exposed entity."""
+        self._unsub_states[entity_id] = async_track_state_change_event(
+            self.hass, entity_id, self._async_handle_state_changed
+        )
+
+    @callback
+    def _async_handle_exposure_changed(self, entity_id, exposed):
+        """Drop all cached responses when the exposed entities change."""
+        self.async_invalidate()
+        unsub = self._unsub_states.pop(entity_id, None)
+        if unsub is not None:
+            unsub()
+        if exposed:
+            self._async_track_state(entity_id)
+
+    @callback
+    def _async_handle_state_changed(self, event):
+        """Drop all cached responses if a state change can change them."""
+        if not self._responses:
+            return
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if old_state is None or new_state is None:
+            return
+        if old_state.attributes == new_state.attributes:
+            return
+        if self._sync_key(old_state) != self._sync_key(new_state):
+            self.async_invalidate()
+            return
+        try:
+            changed = self._sync_attributes(old_state) != self._sync_attributes(
+                new_state
+            )
+        except Exception:  # pylint: disable=broad-except
+            # Leave it to the next SYNC to report the error
+            changed = True
+        if changed:
+            self.async_invalidate()
+
+    @staticmethod
+    def _sync_key(state):
+        """Return the attributes that select the name and traits of a device."""
+        return (
+            state.name,
+            state.attributes.get(ATTR_SUPPORTED_FEATURES, 0),
+            state.attributes.get(ATTR_DEVICE_CLASS),
+        )
+
+    @callback
+    def _sync_attributes(self, state):
+        """Return the trait attributes of a device in a SYNC response."""
+        entity = GoogleEntity(self.hass, self._config, state)
+        return [trt.sync_attributes() for trt in entity.traits()]
+
+
+async def async_get_sync_info(hass: HomeAssistant) -> SyncInfo:
+    """Load the data shared by all devices of a SYNC response."""
+    instance_uuid, dev_reg, ent_reg, area_reg = await gather(
+        hass.helpers.instance_id.async_get(),
+        hass.helpers.device_registry.async_get_registry(),
+        hass.helpers.entity_registry.async_get_registry(),
+        hass.helpers.area_registry.async_get_registry(),
+    )
+
+    room_hints = {}
+    for entity_entry in ent_reg.entities.values():
+        if not entity_entry.device_id:
+            continue
+
+        device_entry = dev_reg.devices.get(entity_entry.device_id)
+        if not (device_entry and device_entry.area_id):
+            continue
+
+        area_entry = area_reg.areas.get(device_entry.area_id)
+        if area_entry and area_entry.name:
+            room_hints[entity_entry.entity_id] = area_entry.name
+
+    return SyncInfo(instance_uuid, room_hints)
 
 
 class GoogleConfigStore:
@@ -310,12 +827,148 @@ class RequestData:
         self.request_id = request_id
         self.context = Context(user_id=user_id)
         self.devices = devices
+        self.service_batch = None
 
     @property
     def is_local_request(self):
         """Return if this is a local request."""
         return self.source == SOURCE_LOCAL
 
+    async def async_call_service(
+        self, domain, service, service_data, blocking=False, context=None
+    ):
+        """Call a service, batched with identical calls of this request."""
+        if self.service_batch is not None:
+            return await self.service_batch.async_call(
+                domain, service, service_data, blocking, context
+            )
+        return await self.config.hass.services.async_call(
+            domain, service, service_data, blocking=blocking, context=context
+        )
+
+
+class ServiceCallBatch:
+    """Merge identical service calls for different entities into one call.
+
+    Calls of BATCHED_SERVICES made in the same event loop iteration that
+    only differ in the entity are sent as a single call with a list of
+    entity ids. Entities in optimistic_entity_ids are called without waiting
+    for the service.
+    """
+
+    def __init__(self, hass: HomeAssistant, optimistic_entity_ids=()):
+        """Initialize the service call batch."""
+        self.hass = hass
+        self.optimistic_entity_ids = set(optimistic_entity_ids)
+        self._pending = {}
+        self.calls = 0
+
+    async def async_call(self, domain, service, service_data, blocking, context):
+        """Queue a service call and wait for the batch it ends up in."""
+        entity_id = service_data.get(ATTR_ENTITY_ID)
+        if entity_id in self.optimistic_entity_ids:
+            blocking = False
+
+        key = None
+        if (
+            isinstance(entity_id, str)
+            and service in BATCHED_SERVICES
+            and domain not in UNBATCHED_DOMAINS
+        ):
+            try:
+                key = (
+                    domain,
+                    service,
+                    blocking,
+                    frozenset(
+                        item
+                        for item in service_data.items()
+                        if item[0] != ATTR_ENTITY_ID
+                    ),
+                )
+            except TypeError:
+                # Unhashable service data, like a color, is not batched
+                pass
+
+        if key is None:
+            self.calls += 1
+            return await self.hass.services.async_call(
+                domain, service, service_data, blocking=blocking, context=context
+            )
+
+        if not self._pending:
+            self.hass.loop.call_soon(self._async_dispatch)
+        future = self.hass.loop.create_future()
+        self._pending.setdefault(key, (context, []))[1].append((entity_id, future))
+        return await future
+
+    @callback
+    def _async_dispatch(self):
+        """Send the queued calls."""
+        pending = self._pending
+        self._pending = {}
+        for key, (context, calls) in pending.items():
+            self.hass.async_create_task(self._async_call_batch(key, context, calls))
+
+    async def _async_call_batch(self, key, context, calls):
+        """Call a service for a batch of entities.
+
+        If the batched call fails, the entities are called one by one so the
+        error is only reported for the entities that caused it. This is safe
+        since only idempotent services are batched.
+        """
+        domain, service, blocking, service_data = key
+        service_data = dict(service_data)
+        entity_ids = [entity_id for entity_id, _ in calls]
+        if len(calls) > 1:
+            self.calls += 1
+            try:
+                await self.hass.services.async_call(
+                    domain,
+                    service,
+                    {**service_data, ATTR_ENTITY_ID: entity_ids},
+                    blocking=blocking,
+                    context=context,
+                )
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.debug(
+                    "Batched %s.%s failed, calling entities one by one",
+                    domain,
+                    service,
+                )
+            else:
+                for _, future in calls:
+                    if not future.done():
+                        future.set_result(None)
+                return
+
+        for entity_id, future in calls:
+            self.calls += 1
+            try:
+                await self.hass.services.async_call(
+                    domain,
+                    service,
+                    {**service_data, ATTR_ENTITY_ID: entity_id},
+                    blocking=blocking,
+                    context=context,
+                )
+            except Exception as err:  # pylint: disable=broad-except
+                if not future.done():
+                    future.set_exception(err)
+            else:
+                if not future.done():
+                    future.set_result(None)
+
+
+@lru_cache(maxsize=None)
+def _supported_traits(domain, features, device_class):
+    """Return the trait classes supported by an entity."""
+    return tuple(
+        Trait
+        for Trait in trait.TRAITS
+        if Trait.supported(domain, features, device_class)
+    )
+
 
 def get_google_type(domain, device_class):
     """Google type based on domain and device class."""
@@ -333,6 +986,9 @@ class GoogleEntity:
         self.config = config
         self.state = state
         self._traits = None
+        self._traits_key = None
+        self._query_state = None
+        self._query_payload = None
 
     @property
     def entity_id(self):
@@ -359,17 +1015,40 @@ class GoogleEntity:
 
         device_class = state.attributes.get(ATTR_DEVICE_CLASS)
 
+        self._traits_key = (domain, features, device_class)
         self._traits = [
             Trait(self.hass, state, self.config)
-            for Trait in trait.TRAITS
-            if Trait.supported(domain, features, device_class)
+            for Trait in _supported_traits(*self._traits_key)
         ]
         return self._traits
 
+    @callback
+    def async_set_state(self, state):
+        """Update the entity to a new state of the same entity.
+
+        The traits are kept unless the domain, supported features or device
+        class changed.
+        """
+        self.state = state
+
+        if self._traits is None:
+            return
+
+        if self._traits_key != (
+            state.domain,
+            state.attributes.get(ATTR_SUPPORTED_FEATURES, 0),
+            state.attributes.get(ATTR_DEVICE_CLASS),
+        ):
+            self._traits = None
+            return
+
+        for trt in self._traits:
+            trt.state = state
+
     @callback
     def should_expose(self):
         """If entity should be exposed."""
-        return self.config.should_expose(self.state)
+        return self.entity_id in self.config.async_get_exposed_entity_ids()
 
     @callback
     def should_expose_local(self) -> bool:
@@ -408,12 +1087,16 @@ class GoogleEntity:
             trait.might_2fa(domain, features, device_class) for trait in self.traits()
         )
 
-    async def sync_serialize(self, agent_user_id):
+    async def sync_serialize(self, agent_user_id, sync_info=None):
         """Serialize entity for a SYNC response.
 
+        Pass the sync_info of the request when serializing several entities.
+
         https://developers.google.com/actions/smarthome/create-app#actiondevicessync
         """
         state = self.state
+        if sync_info is None:
+            sync_info = await async_get_sync_info(self.hass)
 
         entity_config = self.config.entity_config.get(state.entity_id, {})
         name = (entity_config.get(CONF_NAME) or state.name).strip()
@@ -446,7 +1129,7 @@ class GoogleEntity:
                 "webhookId": self.config.local_sdk_webhook_id,
                 "httpPort": self.hass.http.server_port,
                 "httpSSL": self.hass.config.api.use_ssl,
-                "uuid": await self.hass.helpers.instance_id.async_get(),
+                "uuid": sync_info.instance_uuid,
                 "baseUrl": get_url(self.hass, prefer_external=True),
                 "proxyDeviceId": agent_user_id,
             }
@@ -466,29 +1149,11 @@ class GoogleEntity:
         if software:
             device["deviceInfo"]["swVersion"] = software
 
-        room = entity_config.get(CONF_ROOM_HINT)
+        room = entity_config.get(CONF_ROOM_HINT) or sync_info.room_hints.get(
+            state.entity_id
+        )
         if room:
             device["roomHint"] = room
-            return device
-
-
-        dev_reg, ent_reg, area_reg = await gather(
-            self.hass.helpers.device_registry.async_get_registry(),
-            self.hass.helpers.entity_registry.async_get_registry(),
-            self.hass.helpers.area_registry.async_get_registry(),
-        )
-
-        entity_entry = ent_reg.async_get(state.entity_id)
-        if not (entity_entry and entity_entry.device_id):
-            return device
-
-        device_entry = dev_reg.devices.get(entity_entry.device_id)
-        if not (device_entry and device_entry.area_id):
-            return device
-
-        area_entry = area_reg.areas.get(device_entry.area_id)
-        if area_entry and area_entry.name:
-            device["roomHint"] = area_entry.name
 
         return device
 
@@ -510,6 +1175,17 @@ class GoogleEntity:
 
         return attrs
 
+    @callback
+    def async_query_serialize_cached(self):
+        """Serialize entity for a QUERY response, once per state.
+
+        The returned dict is shared between callers and must not be modified.
+        """
+        if self._query_state is not self.state:
+            self._query_payload = self.query_serialize()
+            self._query_state = self.state
+        return self._query_payload
+
     @callback
     def reachable_device_serialize(self):
         """Serialize entity for a REACHABLE_DEVICE response."""
@@ -562,13 +1238,16 @@ def deep_update(target, source):
 def async_get_entities(hass, config) -> List[GoogleEntity]:
     """Return all entities that are supported by Google."""
     entities = []
+    entity_ids = set()
     for state in hass.states.async_all():
         if state.entity_id in CLOUD_NEVER_EXPOSED_ENTITIES:
             continue
 
-        entity = GoogleEntity(hass, config, state)
+        entity = config.async_get_entity(state)
+        entity_ids.add(state.entity_id)
 
         if entity.is_supported():
             entities.append(entity)
 
+    config.async_prune_entities(entity_ids)
     return entities
@@ -0,0 +1,199 @@
+"""Client for the Google HomeGraph API."""
+import asyncio
+from datetime import timedelta
+import logging
+
+from aiohttp import ClientSession, TCPConnector
+import jwt
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, ssl as ssl_util
+
+from .const import (
+    CONF_CLIENT_EMAIL,
+    CONF_PRIVATE_KEY,
+    DOMAIN,
+    HOMEGRAPH_SCOPE,
+    HOMEGRAPH_TOKEN_URL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.homegraph_token"
+STORAGE_VERSION = 1
+
+# Seconds before expiry at which the access token is renewed
+TOKEN_RENEW_MARGIN = 300
+# Seconds to wait before retrying a failed token renewal
+TOKEN_RETRY_DELAY = 60
+
+HOMEGRAPH_CONNECTION_LIMIT = 4
+HOMEGRAPH_KEEPALIVE_TIMEOUT = 300
+
+
+def _get_homegraph_jwt(time, iss, key):
+    now = int(time.timestamp())
+
+    jwt_raw = {
+        "iss": iss,
+        "scope": HOMEGRAPH_SCOPE,
+        "aud": HOMEGRAPH_TOKEN_URL,
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(jwt_raw, key, algorithm="RS256").decode("utf-8")
+
+
+async def _get_homegraph_token(session, jwt_signed):
+    headers = {
+        "Authorization": f"Bearer {jwt_signed}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+    data = {
+        "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
+        "assertion": jwt_signed,
+    }
+
+    async with session.post(HOMEGRAPH_TOKEN_URL, headers=headers, data=data) as res:
+        res.raise_for_status()
+        return await res.json()
+
+
+class HomeGraphClient:
+    """Call the HomeGraph API with a service account.
+
+    Requests share a keep-alive connection pool. The access token is stored
+    in .storage so it survives restarts and is renewed in the background
+    before it expires, requests only wait for a token when none is valid.
+    """
+
+    def __init__(self, hass: HomeAssistant, service_account):
+        """Initialize the HomeGraph client."""
+        self.hass = hass
+        self._client_email = service_account[CONF_CLIENT_EMAIL]
+        self._private_key = service_account[CONF_PRIVATE_KEY]
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._session = None
+        self._access_token = None
+        self._expires_at = None
+        self._headers = None
+        self._token_lock = asyncio.Lock()
+        self._unsub_renew = None
+        self._unsub_close = None
+
+    async def async_initialize(self):
+        """Load the stored access token and schedule its renewal."""
+        data = await self._store.async_load()
+        if data and data.get("client_email") == self._client_email:
+            expires_at = dt_util.parse_datetime(data["expires_at"])
+            if expires_at is not None and expires_at > dt_util.utcnow():
+                self._async_set_token(data["access_token"], expires_at)
+                _LOGGER.debug("Loaded HomeGraph token valid until %s", expires_at)
+
+        self._unsub_close = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, self._async_handle_close
+        )
+
+    @property
+    def session(self):
+        """Return the session for HomeGraph requests."""
+        if self._session is None:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit_per_host=HOMEGRAPH_CONNECTION_LIMIT,
+                    keepalive_timeout=HOMEGRAPH_KEEPALIVE_TIMEOUT,
+                    enable_cleanup_closed=True,
+                    ssl=ssl_util.client_context(),
+                )
+            )
+        return self._session
+
+    async def async_get_headers(self, force=False):
+        """Return the headers of an authorized request, renewing if needed."""
+        if force or not self._token_valid:
+            await self.async_renew_token(force)
+        return self._headers
+
+    async def async_renew_token(self, force=False):
+        """Fetch a new access token, unless another call just did."""
+        previous_token = self._access_token
+        async with self._token_lock:
+            if self._token_valid and not (
+                force and self._access_token == previous_token
+            ):
+                return
+
+            now = dt_util.utcnow()
+            jwt_signed = await self.hass.async_add_executor_job(
+                _get_homegraph_jwt, now, self._client_email, self._private_key
+            )
+            token = await _get_homegraph_token(self.session, jwt_signed)
+            expires_at = now + timedelta(seconds=token["expires_in"])
+            self._async_set_token(token["access_token"], expires_at)
+            self._store.async_delay_save(self._data_to_save, 1.0)
+
+    @property
+    def _token_valid(self):
+        """Return if the current access token has not expired."""
+        return self._access_token is not None and dt_util.utcnow() < self._expires_at
+
+    @callback
+    def _async_set_token(self, access_token, expires_at):
+        """Use a new access token and schedule its renewal."""
+        self._access_token = access_token
+        self._expires_at = expires_at
+        self._headers = {
+            "Authorization": f"Bearer {access_token}",
+            "X-GFE-SSL": "yes",
+        }
+        delay = (expires_at - dt_util.utcnow()).total_seconds() - TOKEN_RENEW_MARGIN
+        self._async_schedule_renew(max(delay, 0))
+
+    @callback
+    def _async_schedule_renew(self, delay):
+        """Schedule a background renewal of the access token."""
+        if self._unsub_renew is not None:
+            self._unsub_renew()
+        self._unsub_renew = async_call_later(self.hass, delay, self._async_renew)
+
+    async def _async_renew(self, _now):
+        """Renew the access token ahead of its expiry."""
+        self._unsub_renew = None
+        try:
+            await self.async_renew_token(force=True)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.warning(
+                "Failed to renew HomeGraph token, retrying in %ds",
+                TOKEN_RETRY_DELAY,
+                exc_info=True,
+            )
+            self._async_schedule_renew(TOKEN_RETRY_DELAY)
+
+    @callback
+    def _data_to_save(self):
+        """Return the token data to store."""
+        return {
+            "client_email": self._client_email,
+            "access_token": self._access_token,
+            "expires_at": self._expires_at.isoformat(),
+        }
+
+    async def _async_handle_close(self, _event):
+        """Close the connection pool when Home Assistant closes."""
+        self._unsub_close = None
+        await self.async_close()
+
+    async def async_close(self):
+        """Cancel the token renewal and close the connection pool."""
+        if self._unsub_renew is not None:
+            self._unsub_renew()
+            self._unsub_renew = None
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
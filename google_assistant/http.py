@@ -1,12 +1,10 @@
 """Support for Google Actions Smart Home Control."""
 import asyncio
-from datetime import timedelta
 import logging
 from uuid import uuid4
 
 from aiohttp import ClientError, ClientResponseError
 from aiohttp.web import Request, Response
-import jwt
 
 # Typing imports
 from homeassistant.components.http import HomeAssistantView
@@ -16,61 +14,29 @@ from homeassistant.const import (
     HTTP_UNAUTHORIZED,
 )
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.util import dt as dt_util
 
 from .const import (
     CONF_API_KEY,
-    CONF_CLIENT_EMAIL,
     CONF_ENTITY_CONFIG,
     CONF_EXPOSE,
     CONF_EXPOSE_BY_DEFAULT,
     CONF_EXPOSED_DOMAINS,
-    CONF_PRIVATE_KEY,
     CONF_REPORT_STATE,
     CONF_SECURE_DEVICES_PIN,
     CONF_SERVICE_ACCOUNT,
+    CONF_SYNC_DELAY,
     GOOGLE_ASSISTANT_API_ENDPOINT,
-    HOMEGRAPH_SCOPE,
-    HOMEGRAPH_TOKEN_URL,
     REPORT_STATE_BASE_URL,
     REQUEST_SYNC_BASE_URL,
     SOURCE_CLOUD,
 )
 from .helpers import AbstractConfig
+from .homegraph import HomeGraphClient
 from .smart_home import async_handle_message
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _get_homegraph_jwt(time, iss, key):
-    now = int(time.timestamp())
-
-    jwt_raw = {
-        "iss": iss,
-        "scope": HOMEGRAPH_SCOPE,
-        "aud": HOMEGRAPH_TOKEN_URL,
-        "iat": now,
-        "exp": now + 3600,
-    }
-    return jwt.encode(jwt_raw, key, algorithm="RS256").decode("utf-8")
-
-
-async def _get_homegraph_token(hass, jwt_signed):
-    headers = {
-        "Authorization": f"Bearer {jwt_signed}",
-        "Content-Type": "application/x-www-form-urlencoded",
-    }
-    data = {
-        "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
-        "assertion": jwt_signed,
-    }
-
-    session = async_get_clientsession(hass)
-    async with session.post(HOMEGRAPH_TOKEN_URL, headers=headers, data=data) as res:
-        res.raise_for_status()
-        return await res.json()
-
-
 class GoogleConfig(AbstractConfig):
     """Config for manual setup of Google."""
 
@@ -78,8 +44,15 @@ class GoogleConfig(AbstractConfig):
         """Initialize the config."""
         super().__init__(hass)
         self._config = config
-        self._access_token = None
-        self._access_token_renew = None
+        self._homegraph = None
+        if CONF_SERVICE_ACCOUNT in config:
+            self._homegraph = HomeGraphClient(hass, config[CONF_SERVICE_ACCOUNT])
+
+    async def async_initialize(self):
+        """Perform async initialization of config."""
+        await super().async_initialize()
+        if self._homegraph is not None:
+            await self._homegraph.async_initialize()
 
     @property
     def enabled(self):
@@ -101,6 +74,11 @@ class GoogleConfig(AbstractConfig):
         """Return if states should be proactively reported."""
         return self._config.get(CONF_REPORT_STATE)
 
+    @property
+    def sync_delay(self):
+        """Return the seconds to wait for further changes before a sync."""
+        return self._config.get(CONF_SYNC_DELAY, super().sync_delay)
+
     def should_expose(self, state) -> bool:
         """Return if entity should be exposed."""
         expose_by_default = self._config.get(CONF_EXPOSE_BY_DEFAULT)
@@ -146,24 +124,6 @@ class GoogleConfig(AbstractConfig):
         else:
             _LOGGER.error("No configuration for request_sync available")
 
-    async def _async_update_token(self, force=False):
-        if CONF_SERVICE_ACCOUNT not in self._config:
-            _LOGGER.error("Trying to get homegraph api token without service account")
-            return
-
-        now = dt_util.utcnow()
-        if not self._access_token or now > self._access_token_renew or force:
-            token = await _get_homegraph_token(
-                self.hass,
-                _get_homegraph_jwt(
-                    now,
-                    self._config[CONF_SERVICE_ACCOUNT][CONF_CLIENT_EMAIL],
-                    self._config[CONF_SERVICE_ACCOUNT][CONF_PRIVATE_KEY],
-                ),
-            )
-            self._access_token = token["access_token"]
-            self._access_token_renew = now + timedelta(seconds=token["expires_in"])
-
     async def async_call_homegraph_api_key(self, url, data):
         """Call a homegraph api with api key authentication."""
         websession = async_get_clientsession(self.hass)
@@ -185,13 +145,13 @@ class GoogleConfig(AbstractConfig):
 
     async def async_call_homegraph_api(self, url, data):
         """Call a homegraph api with authentication."""
-        session = async_get_clientsession(self.hass)
+        if self._homegraph is None:
+            _LOGGER.error("Trying to get homegraph api token without service account")
+            return HTTP_UNAUTHORIZED
+
+        session = self._homegraph.session
 
-        async def _call():
-            headers = {
-                "Authorization": f"Bearer {self._access_token}",
-                "X-GFE-SSL": "yes",
-            }
+        async def _call(headers):
             async with session.post(url, headers=headers, json=data) as res:
                 _LOGGER.debug(
                     "Response on %s with data %s was %s", url, data, await res.text()
@@ -200,16 +160,14 @@ class GoogleConfig(AbstractConfig):
                 return res.status
 
         try:
-            await self._async_update_token()
             try:
-                return await _call()
+                return await _call(await self._homegraph.async_get_headers())
             except ClientResponseError as error:
                 if error.status == HTTP_UNAUTHORIZED:
                     _LOGGER.warning(
                         "Request for %s unauthorized, renewing token and retrying", url
                     )
-                    await self._async_update_token(True)
-                    return await _call()
+                    return await _call(await self._homegraph.async_get_headers(True))
                 raise
         except ClientResponseError as error:
             _LOGGER.error("Request for %s failed: %d", url, error.status)
@@ -225,7 +183,7 @@ class GoogleConfig(AbstractConfig):
             "agentUserId": agent_user_id,
             "payload": message,
         }
-        await self.async_call_homegraph_api(REPORT_STATE_BASE_URL, data)
+        return await self.async_call_homegraph_api(REPORT_STATE_BASE_URL, data)
 
 
 class GoogleAssistantView(HomeAssistantView):
@@ -0,0 +1,63 @@
+"""Fast path for requests of the Google Home local SDK."""
+import json
+
+from homeassistant.helpers.json import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+INTENT_IDENTIFY = "action.devices.IDENTIFY"
+INTENT_REACHABLE_DEVICES = "action.devices.REACHABLE_DEVICES"
+
+
+def _orjson_default(obj):
+    """Serialize the types orjson does not handle natively."""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError
+
+
+def json_loads(data):
+    """Decode a JSON request body."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj) -> bytes:
+    """Encode a response body as JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_orjson_default)
+    return json.dumps(obj, cls=JSONEncoder, separators=(",", ":")).encode()
+
+
+def get_intent(message):
+    """Return the intent of a message, if it has exactly one input."""
+    inputs = message.get("inputs")
+    if not inputs or len(inputs) != 1:
+        return None
+    return inputs[0].get("intent")
+
+
+def response_cache_key(message):
+    """Return the key to cache the response of a message under, if cacheable.
+
+    IDENTIFY responses are the same for every request. REACHABLE_DEVICES
+    responses only depend on the devices Google asks about.
+    """
+    intent = get_intent(message)
+    if intent == INTENT_IDENTIFY:
+        return (intent,)
+    if intent == INTENT_REACHABLE_DEVICES:
+        return (
+            intent,
+            frozenset(device["id"] for device in message.get("devices") or []),
+        )
+    return None
+
+
+def render_response(request_id, payload: bytes) -> bytes:
+    """Wrap a serialized payload into a response for a request."""
+    return b'{"requestId":%s,"payload":%s}' % (json_dumps(request_id), payload)
@@ -1,85 +1,265 @@
 """Google Report State implementation."""
+from asyncio import gather
 import logging
 
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    HTTP_BAD_REQUEST,
+    HTTP_INTERNAL_SERVER_ERROR,
+)
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
 
 from .error import SmartHomeError
-from .helpers import AbstractConfig, GoogleEntity, async_get_entities
+from .helpers import AbstractConfig, async_get_entities
 
 # Time to wait until the homegraph updates
 # https://github.com/actions-on-google/smart-home-nodejs/issues/196#issuecomment-439156639
 INITIAL_REPORT_DELAY = 60
 
+# Seconds to collect state changes before they are reported together
+REPORT_STATE_WINDOW = 1
+# Maximum number of entities in a single report
+REPORT_STATE_MAX_ENTITIES = 100
+# Backoff after a failed report, doubled on every retry
+REPORT_STATE_RETRY_DELAY = 5
+REPORT_STATE_MAX_RETRY_DELAY = 300
+REPORT_STATE_MAX_RETRIES = 5
+
+HTTP_TOO_MANY_REQUESTS = 429
+
 
 _LOGGER = logging.getLogger(__name__)
 
 
-@callback
-def async_enable_report_state(hass: HomeAssistant, google_config: AbstractConfig):
-    """Enable state reporting."""
+class ReportStateQueue:
+    """Collect state changes and report them in batches per agent user.
 
-    async def async_entity_state_listener(changed_entity, old_state, new_state):
-        if not hass.is_running:
+    Changes to the same entity within the window are merged, only the last
+    state is reported. Reports that fail with a throttling or server error
+    are retried with an exponential backoff, changes made in the meantime
+    are sent along with the retry. States that are rejected or given up on
+    are forgotten, so the next change of the entity reports it again.
+    """
+
+    def __init__(self, hass: HomeAssistant, google_config: AbstractConfig):
+        """Initialize the queue."""
+        self.hass = hass
+        self._google_config = google_config
+        self._pending = {}
+        # Last state queued per entity, to only report data Google cares about
+        self._last_reported = {}
+        self._unsub_flush = None
+        self._failed = {}
+        self._attempts = {}
+        self._retries = {}
+
+    @callback
+    def async_queue(self, entity_id, entity_data):
+        """Queue the state of an entity for the next report, if it changed."""
+        if self._last_reported.get(entity_id) == entity_data:
             return
+        self._last_reported[entity_id] = entity_data
 
-        if not new_state:
+        _LOGGER.debug("Queueing state for %s: %s", entity_id, entity_data)
+        self._pending[entity_id] = entity_data
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self.hass, REPORT_STATE_WINDOW, self._async_flush
+            )
+
+    @callback
+    def async_forget(self, entity_id):
+        """Forget the last state of an entity that is no longer reported."""
+        self._last_reported.pop(entity_id, None)
+
+    @callback
+    def async_shutdown(self):
+        """Drop queued states and cancel scheduled reports."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        for unsub in self._retries.values():
+            unsub()
+        self._retries.clear()
+        self._attempts.clear()
+        self._failed.clear()
+        self._pending.clear()
+        self._last_reported.clear()
+
+    async def _async_flush(self, _now=None):
+        """Report all queued states to every agent user."""
+        self._unsub_flush = None
+        states = self._pending
+        self._pending = {}
+        await gather(
+            *[
+                self._async_report(agent_user_id, states)
+                for agent_user_id in self._google_config.agent_user_ids
+            ]
+        )
+
+    async def _async_report(self, agent_user_id, states):
+        """Report states to an agent user, unless it is backing off."""
+        if agent_user_id in self._retries:
+            self._failed.setdefault(agent_user_id, {}).update(states)
             return
 
-        if not google_config.should_expose(new_state):
+        entity_ids = list(states)
+        for start in range(0, len(entity_ids), REPORT_STATE_MAX_ENTITIES):
+            chunk = {
+                entity_id: states[entity_id]
+                for entity_id in entity_ids[start : start + REPORT_STATE_MAX_ENTITIES]
+            }
+            status = await self._google_config.async_report_state(
+                {"devices": {"states": chunk}}, agent_user_id
+            )
+            if status == HTTP_TOO_MANY_REQUESTS or (
+                status is not None and status >= HTTP_INTERNAL_SERVER_ERROR
+            ):
+                failed = {
+                    entity_id: states[entity_id] for entity_id in entity_ids[start:]
+                }
+                self._async_schedule_retry(agent_user_id, failed)
+                return
+            if status is not None and status >= HTTP_BAD_REQUEST:
+                _LOGGER.debug(
+                    "State report for %s was rejected with status %d",
+                    agent_user_id,
+                    status,
+                )
+                self._async_forget_states(chunk)
+
+        self._attempts.pop(agent_user_id, None)
+
+    @callback
+    def _async_schedule_retry(self, agent_user_id, states):
+        """Retry reporting states to an agent user after a backoff."""
+        attempt = self._attempts.get(agent_user_id, 0) + 1
+        if attempt > REPORT_STATE_MAX_RETRIES:
+            _LOGGER.warning(
+                "Dropping state report of %d entities for %s after %d attempts",
+                len(states),
+                agent_user_id,
+                attempt,
+            )
+            self._attempts.pop(agent_user_id)
+            self._async_forget_states(states)
             return
 
-        entity = GoogleEntity(hass, google_config, new_state)
+        self._attempts[agent_user_id] = attempt
+        # States queued in the meantime are newer than the failed ones
+        self._failed[agent_user_id] = {**states, **self._failed.get(agent_user_id, {})}
+        delay = min(
+            REPORT_STATE_RETRY_DELAY * 2 ** (attempt - 1), REPORT_STATE_MAX_RETRY_DELAY
+        )
+        _LOGGER.debug(
+            "Retrying state report for %s in %ds (attempt %d)",
+            agent_user_id,
+            delay,
+            attempt,
+        )
+
+        async def _async_retry(_now):
+            """Send the failed states and those queued since."""
+            self._retries.pop(agent_user_id)
+            await self._async_report(agent_user_id, self._failed.pop(agent_user_id))
+
+        self._retries[agent_user_id] = async_call_later(self.hass, delay, _async_retry)
+
+    @callback
+    def _async_forget_states(self, states):
+        """Forget states that did not reach Google, unless newer ones are queued."""
+        for entity_id, entity_data in states.items():
+            if self._last_reported.get(entity_id) == entity_data:
+                del self._last_reported[entity_id]
+
+
+@callback
+def async_enable_report_state(hass: HomeAssistant, google_config: AbstractConfig):
+    """Enable state reporting."""
+    queue = ReportStateQueue(hass, google_config)
+    unsub_entities = {}
+
+    @callback
+    def async_report_entity(state):
+        """Queue the state of an exposed entity."""
+        entity = google_config.async_get_entity(state)
 
         if not entity.is_supported():
             return
 
         try:
-            entity_data = entity.query_serialize()
+            entity_data = entity.async_query_serialize_cached()
         except SmartHomeError as err:
-            _LOGGER.debug("Not reporting state for %s: %s", changed_entity, err.code)
+            _LOGGER.debug("Not reporting state for %s: %s", state.entity_id, err.code)
             return
 
-        if old_state:
-            old_entity = GoogleEntity(hass, google_config, old_state)
+        queue.async_queue(state.entity_id, entity_data)
 
-            # Only report to Google if data that Google cares about has changed
-            try:
-                if entity_data == old_entity.query_serialize():
-                    return
-            except SmartHomeError:
-                # Happens if old state could not be serialized.
-                # In that case the data is different and should be
-                # reported.
-                pass
+    @callback
+    def async_entity_state_listener(event):
+        if not hass.is_running:
+            return
 
-        _LOGGER.debug("Reporting state for %s: %s", changed_entity, entity_data)
+        new_state = event.data.get("new_state")
 
-        await google_config.async_report_state_all(
-            {"devices": {"states": {changed_entity: entity_data}}}
+        if not new_state:
+            queue.async_forget(event.data[ATTR_ENTITY_ID])
+            return
+
+        async_report_entity(new_state)
+
+    @callback
+    def async_exposure_listener(entity_id, exposed):
+        """Follow the states of the entities that are exposed."""
+        unsub_entity = unsub_entities.pop(entity_id, None)
+        if unsub_entity is not None:
+            unsub_entity()
+
+        if not exposed:
+            queue.async_forget(entity_id)
+            return
+
+        unsub_entities[entity_id] = async_track_state_change_event(
+            hass, entity_id, async_entity_state_listener
         )
+        state = hass.states.get(entity_id)
+        if hass.is_running and state is not None:
+            async_report_entity(state)
 
-    async def inital_report(_now):
+    @callback
+    def inital_report(_now):
         """Report initially all states."""
-        entities = {}
-
         for entity in async_get_entities(hass, google_config):
             if not entity.should_expose():
                 continue
 
             try:
-                entities[entity.entity_id] = entity.query_serialize()
+                entity_data = entity.async_query_serialize_cached()
             except SmartHomeError:
                 continue
 
-        if not entities:
-            return
+            queue.async_queue(entity.entity_id, entity_data)
 
-        await google_config.async_report_state_all({"devices": {"states": entities}})
+    unsub_initial_report = async_call_later(hass, INITIAL_REPORT_DELAY, inital_report)
+    unsub_exposure = google_config.async_track_exposure(async_exposure_listener)
+    for entity_id in google_config.async_get_exposed_entity_ids():
+        unsub_entities[entity_id] = async_track_state_change_event(
+            hass, entity_id, async_entity_state_listener
+        )
 
-    async_call_later(hass, INITIAL_REPORT_DELAY, inital_report)
+    @callback
+    def unsub():
+        """Stop reporting states."""
+        unsub_initial_report()
+        unsub_exposure()
+        for unsub_entity in unsub_entities.values():
+            unsub_entity()
+        unsub_entities.clear()
+        queue.async_shutdown()
 
-    return hass.helpers.event.async_track_state_change(
-        MATCH_ALL, async_entity_state_listener
-    )
+    return unsub
@@ -2,10 +2,12 @@
 import asyncio
 from itertools import product
 import logging
+import time
 
 from homeassistant.const import ATTR_ENTITY_ID, __version__
 from homeassistant.util.decorator import Registry
 
+from . import trait
 from .const import (
     ERR_DEVICE_OFFLINE,
     ERR_PROTOCOL_ERROR,
@@ -15,11 +17,28 @@ from .const import (
     EVENT_SYNC_RECEIVED,
 )
 from .error import SmartHomeError
-from .helpers import GoogleEntity, RequestData, async_get_entities
+from .helpers import (
+    GoogleEntity,
+    RequestData,
+    ServiceCallBatch,
+    async_get_entities,
+    async_get_sync_info,
+)
+from .local_sdk import get_intent
 
 HANDLERS = Registry()
 _LOGGER = logging.getLogger(__name__)
 
+# Commands whose params are the states the device ends up in. When states are
+# reported, EXECUTE answers these right away with the requested states and
+# report state reconciles them with the actual states afterwards.
+OPTIMISTIC_STATE_PARAMS = {
+    trait.COMMAND_ONOFF: ("on",),
+    trait.COMMAND_BRIGHTNESS_ABSOLUTE: ("brightness",),
+    trait.COMMAND_OPENCLOSE: ("openPercent",),
+    trait.COMMAND_THERMOSTAT_TEMPERATURE_SETPOINT: ("thermostatTemperatureSetpoint",),
+}
+
 
 async def async_handle_message(hass, config, user_id, message, source):
     """Handle incoming API messages."""
@@ -27,7 +46,11 @@ async def async_handle_message(hass, config, user_id, message, source):
         config, user_id, source, message["requestId"], message.get("devices")
     )
 
+    start = time.perf_counter()
     response = await _process(hass, data, message)
+    config.async_record_latency(
+        source, get_intent(message), time.perf_counter() - start
+    )
 
     if response and "errorCode" in response["payload"]:
         _LOGGER.error("Error handling message %s: %s", message, response["payload"])
@@ -83,13 +106,28 @@ async def async_devices_sync(hass, data, payload):
     )
 
     agent_user_id = data.config.get_agent_user_id(data.context)
-    entities = async_get_entities(hass, data.config)
+    devices = data.config.async_get_sync_devices(agent_user_id)
+    if devices is None:
+        devices = await _async_sync_serialize(hass, data.config, agent_user_id)
+        data.config.async_set_sync_devices(agent_user_id, devices)
+
+    response = {"agentUserId": agent_user_id, "devices": list(devices)}
+
+    await data.config.async_connect_agent_user(agent_user_id)
+
+    _LOGGER.debug("Syncing entities response: %s", response)
+
+    return response
+
+
+async def _async_sync_serialize(hass, config, agent_user_id):
+    """Serialize all exposed entities for a SYNC response."""
+    entities = [
+        entity for entity in async_get_entities(hass, config) if entity.should_expose()
+    ]
+    sync_info = await async_get_sync_info(hass)
     results = await asyncio.gather(
-        *(
-            entity.sync_serialize(agent_user_id)
-            for entity in entities
-            if entity.should_expose()
-        ),
+        *(entity.sync_serialize(agent_user_id, sync_info) for entity in entities),
         return_exceptions=True,
     )
 
@@ -101,13 +139,7 @@ async def async_devices_sync(hass, data, payload):
         else:
             devices.append(result)
 
-    response = {"agentUserId": agent_user_id, "devices": devices}
-
-    await data.config.async_connect_agent_user(agent_user_id)
-
-    _LOGGER.debug("Syncing entities response: %s", response)
-
-    return response
+    return devices
 
 
 @HANDLERS.register("action.devices.QUERY")
@@ -116,33 +148,43 @@ async def async_devices_query(hass, data, payload):
 
     https://developers.google.com/assistant/smarthome/develop/process-intents#QUERY
     """
+    start = time.perf_counter()
+    device_ids = [device["id"] for device in payload.get("devices", [])]
+
+    # One event per request listing all devices, a QUERY for a whole home can
+    # list hundreds of them
+    hass.bus.async_fire(
+        EVENT_QUERY_RECEIVED,
+        {
+            "request_id": data.request_id,
+            ATTR_ENTITY_ID: device_ids,
+            "source": data.source,
+        },
+        context=data.context,
+    )
+
     devices = {}
-    for device in payload.get("devices", []):
-        devid = device["id"]
+    for devid in device_ids:
         state = hass.states.get(devid)
 
-        hass.bus.async_fire(
-            EVENT_QUERY_RECEIVED,
-            {
-                "request_id": data.request_id,
-                ATTR_ENTITY_ID: devid,
-                "source": data.source,
-            },
-            context=data.context,
-        )
-
         if not state:
             # If we can't find a state, the device is offline
             devices[devid] = {"online": False}
             continue
 
-        entity = GoogleEntity(hass, data.config, state)
+        entity = data.config.async_get_entity(state)
         try:
-            devices[devid] = entity.query_serialize()
+            devices[devid] = entity.async_query_serialize_cached()
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Unexpected error serializing query for %s", state)
             devices[devid] = {"online": False}
 
+    _LOGGER.debug(
+        "QUERY %s for %d devices took %.1f ms",
+        data.request_id,
+        len(device_ids),
+        (time.perf_counter() - start) * 1000,
+    )
     return {"devices": devices}
 
 
@@ -207,15 +249,31 @@ async def handle_devices_execute(hass, data, payload):
                 }
                 continue
 
+            # Traits keep per command data, like a requested camera stream
             entities[entity_id] = GoogleEntity(hass, data.config, state)
             executions[entity_id] = [execution]
 
+    optimistic_states = {}
+    if data.config.is_reporting_state:
+        for entity_id, entity_executions in executions.items():
+            states = _optimistic_states(entity_executions)
+            if states is not None:
+                optimistic_states[entity_id] = states
+
+    # Identical commands for many entities, like turning off all lights,
+    # end up in a single service call
+    data.service_batch = ServiceCallBatch(hass, optimistic_states)
     execute_results = await asyncio.gather(
         *[
             _entity_execute(entities[entity_id], data, executions[entity_id])
             for entity_id in executions
         ]
     )
+    _LOGGER.debug(
+        "Executed commands for %d entities with %d service calls",
+        len(executions),
+        data.service_batch.calls,
+    )
 
     for entity_id, result in zip(executions, execute_results):
         if result is not None:
@@ -228,18 +286,28 @@ async def handle_devices_execute(hass, data, payload):
             continue
 
         entity.async_update()
+        states = entity.query_serialize()
+        states.update(optimistic_states.get(entity.entity_id, {}))
 
         final_results.append(
-            {
-                "ids": [entity.entity_id],
-                "status": "SUCCESS",
-                "states": entity.query_serialize(),
-            }
+            {"ids": [entity.entity_id], "status": "SUCCESS", "states": states}
         )
 
     return {"commands": final_results}
 
 
+def _optimistic_states(executions):
+    """Return the states requested by executions, if they all request states."""
+    states = {}
+    for execution in executions:
+        params = execution.get("params", {})
+        keys = OPTIMISTIC_STATE_PARAMS.get(execution["command"])
+        if keys is None or not all(key in params for key in keys):
+            return None
+        states.update({key: params[key] for key in keys})
+    return states
+
+
 @HANDLERS.register("action.devices.DISCONNECT")
 async def async_devices_disconnect(hass, data: RequestData, payload):
     """Handle action.devices.DISCONNECT request.
@@ -239,7 +239,7 @@ class BrightnessTrait(_Trait):
         domain = self.state.domain
 
         if domain == light.DOMAIN:
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 light.DOMAIN,
                 light.SERVICE_TURN_ON,
                 {
@@ -339,7 +339,7 @@ class OnOffTrait(_Trait):
             service_domain = domain
             service = SERVICE_TURN_ON if params["on"] else SERVICE_TURN_OFF
 
-        await self.hass.services.async_call(
+        await data.async_call_service(
             service_domain,
             service,
             {ATTR_ENTITY_ID: self.state.entity_id},
@@ -440,7 +440,7 @@ class ColorSettingTrait(_Trait):
                     f"Temperature should be between {min_temp} and {max_temp}",
                 )
 
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 light.DOMAIN,
                 SERVICE_TURN_ON,
                 {ATTR_ENTITY_ID: self.state.entity_id, light.ATTR_COLOR_TEMP: temp},
@@ -455,7 +455,7 @@ class ColorSettingTrait(_Trait):
                 *color_util.rgb_hex_to_rgb_list(hex_value)
             )
 
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 light.DOMAIN,
                 SERVICE_TURN_ON,
                 {ATTR_ENTITY_ID: self.state.entity_id, light.ATTR_HS_COLOR: color},
@@ -468,7 +468,7 @@ class ColorSettingTrait(_Trait):
             saturation = color["saturation"] * 100
             brightness = color["value"] * 255
 
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 light.DOMAIN,
                 SERVICE_TURN_ON,
                 {
@@ -508,7 +508,7 @@ class SceneTrait(_Trait):
     async def execute(self, command, data, params, challenge):
         """Execute a scene command."""
         # Don't block for scripts as they can be slow.
-        await self.hass.services.async_call(
+        await data.async_call_service(
             self.state.domain,
             SERVICE_TURN_ON,
             {ATTR_ENTITY_ID: self.state.entity_id},
@@ -542,7 +542,7 @@ class DockTrait(_Trait):
 
     async def execute(self, command, data, params, challenge):
         """Execute a dock command."""
-        await self.hass.services.async_call(
+        await data.async_call_service(
             self.state.domain,
             vacuum.SERVICE_RETURN_TO_BASE,
             {ATTR_ENTITY_ID: self.state.entity_id},
@@ -585,7 +585,7 @@ class StartStopTrait(_Trait):
         """Execute a StartStop command."""
         if command == COMMAND_STARTSTOP:
             if params["start"]:
-                await self.hass.services.async_call(
+                await data.async_call_service(
                     self.state.domain,
                     vacuum.SERVICE_START,
                     {ATTR_ENTITY_ID: self.state.entity_id},
@@ -593,7 +593,7 @@ class StartStopTrait(_Trait):
                     context=data.context,
                 )
             else:
-                await self.hass.services.async_call(
+                await data.async_call_service(
                     self.state.domain,
                     vacuum.SERVICE_STOP,
                     {ATTR_ENTITY_ID: self.state.entity_id},
@@ -602,7 +602,7 @@ class StartStopTrait(_Trait):
                 )
         elif command == COMMAND_PAUSEUNPAUSE:
             if params["pause"]:
-                await self.hass.services.async_call(
+                await data.async_call_service(
                     self.state.domain,
                     vacuum.SERVICE_PAUSE,
                     {ATTR_ENTITY_ID: self.state.entity_id},
@@ -610,7 +610,7 @@ class StartStopTrait(_Trait):
                     context=data.context,
                 )
             else:
-                await self.hass.services.async_call(
+                await data.async_call_service(
                     self.state.domain,
                     vacuum.SERVICE_START,
                     {ATTR_ENTITY_ID: self.state.entity_id},
@@ -800,7 +800,7 @@ class TemperatureSettingTrait(_Trait):
                     f"Temperature should be between {min_temp} and {max_temp}",
                 )
 
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 climate.DOMAIN,
                 climate.SERVICE_SET_TEMPERATURE,
                 {ATTR_ENTITY_ID: self.state.entity_id, ATTR_TEMPERATURE: temp},
@@ -848,7 +848,7 @@ class TemperatureSettingTrait(_Trait):
             else:
                 svc_data[ATTR_TEMPERATURE] = (temp_high + temp_low) / 2
 
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 climate.DOMAIN,
                 climate.SERVICE_SET_TEMPERATURE,
                 svc_data,
@@ -861,7 +861,7 @@ class TemperatureSettingTrait(_Trait):
             supported = self.state.attributes.get(ATTR_SUPPORTED_FEATURES)
 
             if target_mode == "on":
-                await self.hass.services.async_call(
+                await data.async_call_service(
                     climate.DOMAIN,
                     SERVICE_TURN_ON,
                     {ATTR_ENTITY_ID: self.state.entity_id},
@@ -871,7 +871,7 @@ class TemperatureSettingTrait(_Trait):
                 return
 
             if target_mode == "off":
-                await self.hass.services.async_call(
+                await data.async_call_service(
                     climate.DOMAIN,
                     SERVICE_TURN_OFF,
                     {ATTR_ENTITY_ID: self.state.entity_id},
@@ -881,7 +881,7 @@ class TemperatureSettingTrait(_Trait):
                 return
 
             if target_mode in self.google_to_preset:
-                await self.hass.services.async_call(
+                await data.async_call_service(
                     climate.DOMAIN,
                     climate.SERVICE_SET_PRESET_MODE,
                     {
@@ -893,7 +893,7 @@ class TemperatureSettingTrait(_Trait):
                 )
                 return
 
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 climate.DOMAIN,
                 climate.SERVICE_SET_HVAC_MODE,
                 {
@@ -976,7 +976,7 @@ class HumiditySettingTrait(_Trait):
             )
 
         if command == COMMAND_SET_HUMIDITY:
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 humidifier.DOMAIN,
                 humidifier.SERVICE_SET_HUMIDITY,
                 {
@@ -1024,7 +1024,7 @@ class LockUnlockTrait(_Trait):
             _verify_pin_challenge(data, self.state, challenge)
             service = lock.SERVICE_UNLOCK
 
-        await self.hass.services.async_call(
+        await data.async_call_service(
             lock.DOMAIN,
             service,
             {ATTR_ENTITY_ID: self.state.entity_id},
@@ -1146,7 +1146,7 @@ class ArmDisArmTrait(_Trait):
             _verify_pin_challenge(data, self.state, challenge)
             service = SERVICE_ALARM_DISARM
 
-        await self.hass.services.async_call(
+        await data.async_call_service(
             alarm_control_panel.DOMAIN,
             service,
             {
@@ -1240,7 +1240,7 @@ class FanSpeedTrait(_Trait):
         """Execute an SetFanSpeed command."""
         domain = self.state.domain
         if domain == climate.DOMAIN:
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 climate.DOMAIN,
                 climate.SERVICE_SET_FAN_MODE,
                 {
@@ -1251,7 +1251,7 @@ class FanSpeedTrait(_Trait):
                 context=data.context,
             )
         if domain == fan.DOMAIN:
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 fan.DOMAIN,
                 fan.SERVICE_SET_SPEED,
                 {
@@ -1374,7 +1374,7 @@ class ModesTrait(_Trait):
 
         if self.state.domain == input_select.DOMAIN:
             option = params["updateModeSettings"]["option"]
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 input_select.DOMAIN,
                 input_select.SERVICE_SELECT_OPTION,
                 {
@@ -1388,7 +1388,7 @@ class ModesTrait(_Trait):
 
         if self.state.domain == humidifier.DOMAIN:
             requested_mode = settings["mode"]
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 humidifier.DOMAIN,
                 humidifier.SERVICE_SET_MODE,
                 {
@@ -1402,7 +1402,7 @@ class ModesTrait(_Trait):
 
         if self.state.domain == light.DOMAIN:
             requested_effect = settings["effect"]
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 light.DOMAIN,
                 SERVICE_TURN_ON,
                 {
@@ -1424,7 +1424,7 @@ class ModesTrait(_Trait):
         sound_mode = settings.get("sound mode")
 
         if sound_mode:
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 media_player.DOMAIN,
                 media_player.SERVICE_SELECT_SOUND_MODE,
                 {
@@ -1492,7 +1492,7 @@ class InputSelectorTrait(_Trait):
         if requested_source not in sources:
             raise SmartHomeError(ERR_UNSUPPORTED_INPUT, "Unsupported input")
 
-        await self.hass.services.async_call(
+        await data.async_call_service(
             media_player.DOMAIN,
             media_player.SERVICE_SELECT_SOURCE,
             {
@@ -1622,7 +1622,7 @@ class OpenCloseTrait(_Trait):
             ):
                 _verify_pin_challenge(data, self.state, challenge)
 
-            await self.hass.services.async_call(
+            await data.async_call_service(
                 cover.DOMAIN, service, svc_params, blocking=True, context=data.context
             )
 
@@ -1684,7 +1684,7 @@ class VolumeTrait(_Trait):
         return response
 
     async def _set_volume_absolute(self, data, level):
-        await self.hass.services.async_call(
+        await data.async_call_service(
             media_player.DOMAIN,
             media_player.SERVICE_VOLUME_SET,
             {
@@ -1723,7 +1723,7 @@ class VolumeTrait(_Trait):
                 relative = -relative
 
             for _ in range(relative):
-                await self.hass.services.async_call(
+                await data.async_call_service(
                     media_player.DOMAIN,
                     svc,
                     {ATTR_ENTITY_ID: self.state.entity_id},
@@ -1742,7 +1742,7 @@ class VolumeTrait(_Trait):
         ):
             raise SmartHomeError(ERR_NOT_SUPPORTED, "Command not supported")
 
-        await self.hass.services.async_call(
+        await data.async_call_service(
             media_player.DOMAIN,
             media_player.SERVICE_VOLUME_MUTE,
             {
@@ -1911,7 +1911,7 @@ class TransportControlTrait(_Trait):
         else:
             raise SmartHomeError(ERR_NOT_SUPPORTED, "Command not supported")
 
-        await self.hass.services.async_call(
+        await data.async_call_service(
             media_player.DOMAIN,
             service,
             service_attrs,
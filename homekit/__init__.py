@@ -5,6 +5,7 @@ import asyncio
 import ipaddress
 import logging
 import os
+import time
 
 from aiohttp import web
 from pyhap.const import STANDALONE_AID
@@ -26,6 +27,7 @@ from homeassistant.const import (
     ATTR_BATTERY_CHARGING,
     ATTR_BATTERY_LEVEL,
     ATTR_ENTITY_ID,
+    CONF_DEVICE,
     CONF_IP_ADDRESS,
     CONF_NAME,
     CONF_PORT,
@@ -35,16 +37,22 @@ from homeassistant.const import (
     EVENT_HOMEASSISTANT_STOP,
     SERVICE_RELOAD,
 )
-from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.core import CoreState, HomeAssistant, callback, split_entity_id
 from homeassistant.exceptions import ConfigEntryNotReady, Unauthorized
 from homeassistant.helpers import device_registry, entity_registry
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
 from homeassistant.helpers.entityfilter import BASE_FILTER_SCHEMA, FILTER_SCHEMA
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_added_domain,
+    async_track_state_removed_domain,
+)
 from homeassistant.helpers.reload import async_integration_yaml_config
 from homeassistant.loader import IntegrationNotFound, async_get_integration
 from homeassistant.util import get_local_ip
 
-from .accessories import get_accessory
+from .accessories import SUPPORTED_DOMAINS, get_accessory
 from .aidmanager import AccessoryAidStorage
 from .const import (
     AID_STORAGE,
@@ -66,12 +74,15 @@ from .const import (
     CONF_LINKED_HUMIDITY_SENSOR,
     CONF_LINKED_MOTION_SENSOR,
     CONF_SAFE_MODE,
+    CONF_SHARD_PORTS,
+    CONF_SHARDS,
     CONF_ZEROCONF_DEFAULT_INTERFACE,
     CONFIG_OPTIONS,
     DEFAULT_AUTO_START,
     DEFAULT_HOMEKIT_MODE,
     DEFAULT_PORT,
     DEFAULT_SAFE_MODE,
+    DEFAULT_SHARDS,
     DOMAIN,
     HOMEKIT,
     HOMEKIT_MODE_ACCESSORY,
@@ -84,9 +95,16 @@ from .const import (
     SHUTDOWN_TIMEOUT,
     UNDO_UPDATE_LISTENER,
 )
+from .linked_devices import (
+    async_get_linked_device_index,
+    async_remove_linked_device_index,
+)
 from .util import (
     dismiss_setup_message,
+    find_next_available_port,
     get_persist_fullpath_for_entry_id,
+    get_entry_ports,
+    get_shard_id,
     migrate_filesystem_state_data_for_primary_imported_entry_id,
     port_is_available,
     remove_state_files_for_entry_id,
@@ -98,6 +116,9 @@ _LOGGER = logging.getLogger(__name__)
 
 MAX_DEVICES = 150
 
+# Seconds to wait for a burst of accessory changes to settle
+CONFIG_CHANGED_DELAY = 5
+
 # #### Driver Status ####
 STATUS_READY = 0
 STATUS_RUNNING = 1
@@ -129,6 +150,9 @@ BRIDGE_SCHEMA = vol.All(
             vol.Optional(CONF_ADVERTISE_IP): vol.All(ipaddress.ip_address, cv.string),
             vol.Optional(CONF_AUTO_START, default=DEFAULT_AUTO_START): cv.boolean,
             vol.Optional(CONF_SAFE_MODE, default=DEFAULT_SAFE_MODE): cv.boolean,
+            vol.Optional(CONF_SHARDS, default=DEFAULT_SHARDS): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=10)
+            ),
             vol.Optional(CONF_FILTER, default={}): BASE_FILTER_SCHEMA,
             vol.Optional(CONF_ENTITY_CONFIG, default={}): validate_entity_config,
             vol.Optional(CONF_ZEROCONF_DEFAULT_INTERFACE): cv.boolean,
@@ -194,6 +218,8 @@ def _async_update_config_entry_if_from_yaml(hass, entries_by_name, conf):
         # since there currently is no practical way to support
         # all the options in the UI at this time.
         data = conf.copy()
+        if CONF_SHARD_PORTS in entry.data:
+            data[CONF_SHARD_PORTS] = entry.data[CONF_SHARD_PORTS]
         options = {}
         for key in CONFIG_OPTIONS:
             options[key] = data[key]
@@ -216,11 +242,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     port = conf[CONF_PORT]
     _LOGGER.debug("Begin setup HomeKit for %s", name)
 
+    # ip_address, advertise_ip and shards are yaml only
+    shards = conf.get(CONF_SHARDS, DEFAULT_SHARDS)
+    if options.get(CONF_HOMEKIT_MODE, DEFAULT_HOMEKIT_MODE) == HOMEKIT_MODE_ACCESSORY:
+        shards = 1
+    shard_ports = await _async_get_shard_ports(hass, entry, shards)
+
     # If the previous instance hasn't cleaned up yet
     # we need to wait a bit
-    if not await hass.async_add_executor_job(port_is_available, port):
-        _LOGGER.warning("The local port %s is in use", port)
-        raise ConfigEntryNotReady
+    for bridge_port in (port, *shard_ports):
+        if not await hass.async_add_executor_job(port_is_available, bridge_port):
+            _LOGGER.warning("The local port %s is in use", bridge_port)
+            raise ConfigEntryNotReady
 
     if CONF_ENTRY_INDEX in conf and conf[CONF_ENTRY_INDEX] == 0:
         _LOGGER.debug("Migrating legacy HomeKit data for %s", name)
@@ -233,7 +266,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     aid_storage = AccessoryAidStorage(hass, entry.entry_id)
 
     await aid_storage.async_initialize()
-    # ip_address and advertise_ip are yaml only
     ip_address = conf.get(CONF_IP_ADDRESS)
     advertise_ip = conf.get(CONF_ADVERTISE_IP)
     homekit_mode = options.get(CONF_HOMEKIT_MODE, DEFAULT_HOMEKIT_MODE)
@@ -253,6 +285,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         homekit_mode,
         advertise_ip,
         entry.entry_id,
+        shards,
+        shard_ports,
     )
     zeroconf_instance = await zeroconf.async_get_instance(hass)
     await hass.async_add_executor_job(homekit.setup, zeroconf_instance)
@@ -273,6 +307,34 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     return True
 
 
+async def _async_get_shard_ports(hass: HomeAssistant, entry: ConfigEntry, shards):
+    """Return the ports of the bridge shards, allocating missing ones.
+
+    Allocated ports are stored in the entry so shards keep their port across
+    restarts. Ports configured for other bridges are never handed out.
+    """
+    shard_ports = list(entry.data.get(CONF_SHARD_PORTS, []))
+    if len(shard_ports) >= shards - 1:
+        return shard_ports[: shards - 1]
+
+    used_ports = {
+        port
+        for other_entry in hass.config_entries.async_entries(DOMAIN)
+        for port in get_entry_ports(other_entry)
+    }
+    while len(shard_ports) < shards - 1:
+        port = await hass.async_add_executor_job(
+            find_next_available_port, entry.data[CONF_PORT] + 1, used_ports
+        )
+        shard_ports.append(port)
+        used_ports.add(port)
+
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_SHARD_PORTS: shard_ports}
+    )
+    return shard_ports
+
+
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
     """Handle options update."""
     if entry.source == SOURCE_IMPORT:
@@ -291,14 +353,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     if homekit.status == STATUS_RUNNING:
         await homekit.async_stop()
 
-    for _ in range(0, SHUTDOWN_TIMEOUT):
-        if not await hass.async_add_executor_job(
-            port_is_available, entry.data[CONF_PORT]
-        ):
+    for shard_id in homekit.shard_ids[1:]:
+        dismiss_setup_message(hass, shard_id)
+        hass.data[DOMAIN].pop(shard_id, None)
+
+    for port in get_entry_ports(entry):
+        for _ in range(0, SHUTDOWN_TIMEOUT):
+            if await hass.async_add_executor_job(port_is_available, port):
+                break
             _LOGGER.info("Waiting for the HomeKit server to shutdown")
             await asyncio.sleep(1)
 
     hass.data[DOMAIN].pop(entry.entry_id)
+    if not any(HOMEKIT in data for data in hass.data[DOMAIN].values()):
+        async_remove_linked_device_index(hass)
 
     return True
 
@@ -416,6 +484,8 @@ class HomeKit:
         homekit_mode,
         advertise_ip=None,
         entry_id=None,
+        shards=DEFAULT_SHARDS,
+        shard_ports=None,
     ):
         """Initialize a HomeKit object."""
         self.hass = hass
@@ -430,8 +500,18 @@ class HomeKit:
         self._homekit_mode = homekit_mode
         self.status = STATUS_READY
 
+        if homekit_mode == HOMEKIT_MODE_ACCESSORY:
+            shards = 1
+        self.shard_ids = [get_shard_id(entry_id, index) for index in range(shards)]
+        self._shard_ports = shard_ports or []
+
         self.bridge = None
         self.driver = None
+        self.bridges = []
+        self.drivers = []
+        self._subscriptions = []
+        self._changed_drivers = set()
+        self._config_changed_unsub = None
 
     def setup(self, zeroconf_instance):
         """Set up bridge and accessory driver."""
@@ -440,30 +520,73 @@ class HomeKit:
 
         self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self.async_stop)
         ip_addr = self._ip_address or get_local_ip()
-        persist_file = get_persist_fullpath_for_entry_id(self.hass, self._entry_id)
+        ports = [self._port, *self._shard_ports]
 
-        self.driver = HomeDriver(
-            self.hass,
-            self._entry_id,
-            self._name,
-            loop=self.hass.loop,
-            address=ip_addr,
-            port=self._port,
-            persist_file=persist_file,
-            advertised_address=self._advertise_ip,
-            zeroconf_instance=zeroconf_instance,
-        )
+        for index, shard_id in enumerate(self.shard_ids):
+            port = ports[index]
+            if index:
+                # Each shard is a separate bridge with its own pairing
+                self.hass.data[DOMAIN].setdefault(shard_id, {})
+            persist_file = get_persist_fullpath_for_entry_id(self.hass, shard_id)
 
-        # If we do not load the mac address will be wrong
-        # as pyhap uses a random one until state is restored
-        if os.path.exists(persist_file):
-            self.driver.load()
-        else:
-            self.driver.persist()
+            driver = HomeDriver(
+                self.hass,
+                shard_id,
+                self._shard_name(index),
+                loop=self.hass.loop,
+                address=ip_addr,
+                port=port,
+                persist_file=persist_file,
+                advertised_address=self._advertise_ip,
+                zeroconf_instance=zeroconf_instance,
+            )
 
-        if self._safe_mode:
-            _LOGGER.debug("Safe_mode selected for %s", self._name)
-            self.driver.safe_mode = True
+            # If we do not load the mac address will be wrong
+            # as pyhap uses a random one until state is restored
+            if os.path.exists(persist_file):
+                driver.load()
+            else:
+                driver.persist()
+
+            if self._safe_mode:
+                _LOGGER.debug("Safe_mode selected for %s", self._shard_name(index))
+                driver.safe_mode = True
+
+            self.drivers.append(driver)
+
+        self.driver = self.drivers[0]
+
+    def _shard_name(self, index):
+        """Return the name of a bridge shard."""
+        if index == 0:
+            return self._name
+        return f"{self._name} {index + 1}"
+
+    def _shard_indexes(self, aid):
+        """Return the shards in the order an accessory is placed on them.
+
+        The aid is a stable hash so an accessory stays on the same
+        bridge across restarts as long as the number of shards is unchanged
+        and its preferred shard is not full.
+        """
+        shards = len(self.drivers)
+        preferred = aid % shards
+        return [(preferred + offset) % shards for offset in range(shards)]
+
+    def _shard_index(self, aid):
+        """Return the shard an accessory is on, if any."""
+        for index in self._shard_indexes(aid):
+            if aid in self.bridges[index].accessories:
+                return index
+        return None
+
+    def _free_shard_index(self, aid):
+        """Return the shard a new accessory goes to, if any has room."""
+        for index in self._shard_indexes(aid):
+            # The bridge itself counts as an accessory
+            if len(self.bridges[index].accessories) + 1 < MAX_DEVICES:
+                return index
+        return None
 
     def reset_accessories(self, entity_ids):
         """Reset the accessory to load the latest configuration."""
@@ -472,67 +595,75 @@ class HomeKit:
             return
 
         aid_storage = self.hass.data[DOMAIN][self._entry_id][AID_STORAGE]
-        removed = []
+        removed = {}
         for entity_id in entity_ids:
             aid = aid_storage.get_or_allocate_aid_for_entity_id(entity_id)
-            if aid not in self.bridge.accessories:
+            index = self._shard_index(aid)
+            if index is None:
                 continue
 
             _LOGGER.info(
                 "HomeKit Bridge %s will reset accessory with linked entity_id %s",
-                self._name,
+                self._shard_name(index),
                 entity_id,
             )
 
             acc = self.remove_bridge_accessory(aid)
-            removed.append(acc)
+            removed.setdefault(index, []).append(acc)
 
         if not removed:
             # No matched accessories, probably on another bridge
             return
 
-        self.driver.config_changed()
+        for index in removed:
+            self.drivers[index].config_changed()
 
-        for acc in removed:
-            self.bridge.add_accessory(acc)
-        self.driver.config_changed()
+        for index, accs in removed.items():
+            for acc in accs:
+                self.bridges[index].add_accessory(acc)
+            self.drivers[index].config_changed()
 
-    def add_bridge_accessory(self, state):
+    def add_bridge_accessory(self, state, aid=None):
         """Try adding accessory to bridge if configured beforehand."""
         if not self._filter(state.entity_id):
-            return
-
-        # The bridge itself counts as an accessory
-        if len(self.bridge.accessories) + 1 >= MAX_DEVICES:
+            return None
+
+        if aid is None:
+            aid = self.hass.data[DOMAIN][self._entry_id][
+                AID_STORAGE
+            ].get_or_allocate_aid_for_entity_id(state.entity_id)
+        index = self._free_shard_index(aid)
+        if index is None:
             _LOGGER.warning(
-                "Cannot add %s as this would exceeded the %d device limit. Consider using the filter option",
+                "Cannot add %s as this would exceeded the %d device limit. Consider using the filter or shards option",
                 state.entity_id,
                 MAX_DEVICES,
             )
-            return
+            return None
+        bridge = self.bridges[index]
 
-        aid = self.hass.data[DOMAIN][self._entry_id][
-            AID_STORAGE
-        ].get_or_allocate_aid_for_entity_id(state.entity_id)
-        conf = self._config.pop(state.entity_id, {})
+        # Keep the config around in case the entity is added again later
+        conf = self._config.get(state.entity_id, {}).copy()
         # If an accessory cannot be created or added due to an exception
         # of any kind (usually in pyhap) it should not prevent
         # the rest of the accessories from being created
         try:
-            acc = get_accessory(self.hass, self.driver, state, aid, conf)
+            acc = get_accessory(self.hass, self.drivers[index], state, aid, conf)
             if acc is not None:
-                self.bridge.add_accessory(acc)
+                bridge.add_accessory(acc)
+            return acc
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception(
                 "Failed to create a HomeKit accessory for %s", state.entity_id
             )
+        return None
 
     def remove_bridge_accessory(self, aid):
-        """Try adding accessory to bridge if configured beforehand."""
-        acc = None
-        if aid in self.bridge.accessories:
-            acc = self.bridge.accessories.pop(aid)
-        return acc
+        """Try removing accessory from bridge."""
+        index = self._shard_index(aid)
+        if index is None:
+            return None
+        return self.bridges[index].remove_accessory(aid)
 
     async def async_start(self, *args):
         """Start the accessory driver."""
@@ -540,106 +671,273 @@ class HomeKit:
             return
         self.status = STATUS_WAIT
 
+        await self._async_create_accessories()
+        for driver in self.drivers:
+            _LOGGER.debug("Driver start for %s", driver.bridge_name)
+            self.hass.add_job(driver.start_service)
+        self.status = STATUS_RUNNING
+
+        if self.bridge:
+            self._async_track_entity_changes()
+
+    async def _async_create_accessories(self):
+        """Create the accessories of all bridged entities."""
+        start_time = time.monotonic()
         ent_reg = await entity_registry.async_get_registry(self.hass)
         dev_reg = await device_registry.async_get_registry(self.hass)
 
-        device_lookup = ent_reg.async_get_device_class_lookup(
-            {
-                (BINARY_SENSOR_DOMAIN, DEVICE_CLASS_BATTERY_CHARGING),
-                (BINARY_SENSOR_DOMAIN, DEVICE_CLASS_MOTION),
-                (BINARY_SENSOR_DOMAIN, DEVICE_CLASS_OCCUPANCY),
-                (SENSOR_DOMAIN, DEVICE_CLASS_BATTERY),
-                (SENSOR_DOMAIN, DEVICE_CLASS_HUMIDITY),
-            }
+        bridged_states = self._async_filter_states()
+        filter_time = time.monotonic()
+
+        await self._async_prepare_entities(bridged_states, ent_reg, dev_reg)
+        device_info_time = time.monotonic()
+
+        aids = self.hass.data[DOMAIN][self._entry_id][AID_STORAGE].allocate_many(
+            [state.entity_id for state in bridged_states]
         )
 
-        bridged_states = []
-        for state in self.hass.states.async_all():
-            if not self._filter(state.entity_id):
-                continue
+        self._async_register_bridge(dev_reg)
+        await self.hass.async_add_executor_job(self._start, bridged_states, aids)
+        build_time = time.monotonic()
+        _LOGGER.debug(
+            "Built %d accessories for %s in %.3fs "
+            "(filter: %.3fs, device info: %.3fs, accessories: %.3fs)",
+            len(bridged_states),
+            self._name,
+            build_time - start_time,
+            filter_time - start_time,
+            device_info_time - filter_time,
+            build_time - device_info_time,
+        )
+
+    async def _async_prepare_entities(self, states, ent_reg, dev_reg):
+        """Set device info and linked sensors in the config of each entity."""
+        device_lookup = async_get_linked_device_index(self.hass, ent_reg).lookup
 
+        platforms = {}
+        for state in states:
             ent_reg_ent = ent_reg.async_get(state.entity_id)
             if ent_reg_ent:
-                await self._async_set_device_info_attributes(
+                if not self._async_set_device_info_attributes(
                     ent_reg_ent, dev_reg, state.entity_id
-                )
+                ):
+                    platforms.setdefault(ent_reg_ent.platform, []).append(
+                        state.entity_id
+                    )
                 self._async_configure_linked_sensors(ent_reg_ent, device_lookup, state)
 
-            bridged_states.append(state)
+        integration_names = await self._async_get_integration_names(platforms)
+        for platform, entity_ids in platforms.items():
+            for entity_id in entity_ids:
+                self._config[entity_id][ATTR_INTERGRATION] = integration_names[
+                    platform
+                ]
 
-        self._async_register_bridge(dev_reg)
-        await self.hass.async_add_executor_job(self._start, bridged_states)
-        _LOGGER.debug("Driver start for %s", self._name)
-        self.hass.add_job(self.driver.start_service)
-        self.status = STATUS_RUNNING
+    @callback
+    def _async_track_entity_changes(self):
+        """Add and remove bridged accessories as entities come and go.
+
+        Only additions and removals in the domains that can become an
+        accessory are dispatched, other state changes never reach the bridge.
+        """
+        domains = set(SUPPORTED_DOMAINS)
+        domains.update(
+            split_entity_id(entity_id)[0]
+            for entity_id, entity_config in self._config.items()
+            if CONF_DEVICE in entity_config
+        )
+        self._subscriptions.append(
+            async_track_state_added_domain(
+                self.hass, domains, self._async_handle_state_added
+            )
+        )
+        self._subscriptions.append(
+            async_track_state_removed_domain(
+                self.hass, domains, self._async_handle_state_removed
+            )
+        )
+        self._subscriptions.append(
+            self.hass.bus.async_listen(
+                EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_registry_updated
+            )
+        )
+
+    @callback
+    def _async_handle_state_added(self, event):
+        """Handle an entity being added to the state machine."""
+        new_state = event.data["new_state"]
+        if (
+            new_state.domain in SUPPORTED_DOMAINS
+            or CONF_DEVICE in self._config.get(new_state.entity_id, {})
+        ) and self._filter(new_state.entity_id):
+            self.hass.async_create_task(self._async_add_accessory(new_state))
+
+    @callback
+    def _async_handle_state_removed(self, event):
+        """Handle an entity being removed from the state machine."""
+        self._async_remove_accessory(event.data[ATTR_ENTITY_ID])
+
+    @callback
+    def _async_handle_registry_updated(self, event):
+        """Handle an entity being removed from the entity registry."""
+        if event.data["action"] != "remove":
+            return
+
+        aid = self._async_remove_accessory(event.data[ATTR_ENTITY_ID])
+        if aid is not None:
+            # The entity is gone for good, release its allocation
+            self.hass.data[DOMAIN][self._entry_id][AID_STORAGE].delete_aids([aid])
+
+    async def _async_add_accessory(self, state):
+        """Add a new accessory to the running bridge."""
+        if self.status != STATUS_RUNNING or self._async_find_aid(state.entity_id):
+            return
+
+        ent_reg = await entity_registry.async_get_registry(self.hass)
+        dev_reg = await device_registry.async_get_registry(self.hass)
+        await self._async_prepare_entities([state], ent_reg, dev_reg)
+        if not self._filter(state.entity_id):
+            return
+
+        aid = self.hass.data[DOMAIN][self._entry_id][
+            AID_STORAGE
+        ].get_or_allocate_aid_for_entity_id(state.entity_id)
+        acc = await self.hass.async_add_executor_job(
+            self.add_bridge_accessory, state, aid
+        )
+        if acc is None:
+            return
+
+        _LOGGER.info(
+            "HomeKit Bridge %s added accessory for %s", self._name, state.entity_id
+        )
+        await acc.run_handler()
+        self._async_schedule_config_changed(acc.driver)
+
+    @callback
+    def _async_remove_accessory(self, entity_id):
+        """Remove an accessory from the running bridge and return its aid."""
+        if self.status != STATUS_RUNNING:
+            return None
+
+        aid = self._async_find_aid(entity_id)
+        if aid is None:
+            return None
+
+        _LOGGER.info(
+            "HomeKit Bridge %s removed accessory for %s", self._name, entity_id
+        )
+        acc = self.remove_bridge_accessory(aid)
+        acc.async_stop()
+        self._async_schedule_config_changed(acc.driver)
+        return aid
+
+    @callback
+    def _async_find_aid(self, entity_id):
+        """Return the aid of the bridged accessory for an entity."""
+        aid_storage = self.hass.data[DOMAIN][self._entry_id][AID_STORAGE]
+        aid = aid_storage.get_aid_for_entity_id(entity_id)
+        if aid is None:
+            return None
+        for bridge in self.bridges:
+            acc = bridge.accessories.get(aid)
+            if acc is not None and acc.entity_id == entity_id:
+                return aid
+        return None
+
+    @callback
+    def _async_schedule_config_changed(self, driver):
+        """Bump the config number once a burst of changes has settled."""
+        self._changed_drivers.add(driver)
+        if self._config_changed_unsub:
+            self._config_changed_unsub()
+        self._config_changed_unsub = async_call_later(
+            self.hass, CONFIG_CHANGED_DELAY, self._async_config_changed
+        )
+
+    async def _async_config_changed(self, _now):
+        """Notify controllers that the accessories have changed."""
+        self._config_changed_unsub = None
+        changed_drivers = self._changed_drivers
+        self._changed_drivers = set()
+        if self.status != STATUS_RUNNING:
+            return
+        for driver in changed_drivers:
+            await self.hass.async_add_executor_job(driver.config_changed)
+
+    @callback
+    def _async_filter_states(self):
+        """Return the states that should be exposed.
+
+        States in domains that cannot become an accessory are skipped
+        before the entity filter is applied.
+        """
+        custom_entity_ids = {
+            entity_id
+            for entity_id, entity_config in self._config.items()
+            if CONF_DEVICE in entity_config
+        }
+        return [
+            state
+            for state in self.hass.states.async_all()
+            if (
+                state.domain in SUPPORTED_DOMAINS
+                or state.entity_id in custom_entity_ids
+            )
+            and self._filter(state.entity_id)
+        ]
 
     @callback
     def _async_register_bridge(self, dev_reg):
         """Register the bridge as a device so homekit_controller and exclude it from discovery."""
-        formatted_mac = device_registry.format_mac(self.driver.state.mac)
-        # Connections and identifiers are both used here.
-        #
-        # connections exists so homekit_controller can know the
-        # virtual mac address of the bridge and know to not offer
-        # it via discovery.
-        #
-        # identifiers is used as well since the virtual mac may change
-        # because it will not survive manual pairing resets (deleting state file)
-        # which we have trained users to do over the past few years
-        # because this was the way you had to fix homekit when pairing
-        # failed.
-        #
-        connection = (device_registry.CONNECTION_NETWORK_MAC, formatted_mac)
-        identifier = (DOMAIN, self._entry_id, BRIDGE_SERIAL_NUMBER)
-        self._async_purge_old_bridges(dev_reg, identifier, connection)
-        dev_reg.async_get_or_create(
-            config_entry_id=self._entry_id,
-            identifiers={identifier},
-            connections={connection},
-            manufacturer=MANUFACTURER,
-            name=self._name,
-            model="HomeKit Bridge",
-        )
+        bridge_devices = []
+        for index, driver in enumerate(self.drivers):
+            formatted_mac = device_registry.format_mac(driver.state.mac)
+            # Connections and identifiers are both used here.
+            #
+            # connections exists so homekit_controller can know the
+            # virtual mac address of the bridge and know to not offer
+            # it via discovery.
+            #
+            # identifiers is used as well since the virtual mac may change
+            # because it will not survive manual pairing resets (deleting state file)
+            # which we have trained users to do over the past few years
+            # because this was the way you had to fix homekit when pairing
+            # failed.
+            #
+            connection = (device_registry.CONNECTION_NETWORK_MAC, formatted_mac)
+            serial_number = BRIDGE_SERIAL_NUMBER
+            if index:
+                serial_number = f"{BRIDGE_SERIAL_NUMBER}.{index + 1}"
+            identifier = (DOMAIN, self._entry_id, serial_number)
+            bridge_devices.append((identifier, connection, self._shard_name(index)))
+
+        self._async_purge_old_bridges(dev_reg, bridge_devices)
+        for identifier, connection, name in bridge_devices:
+            dev_reg.async_get_or_create(
+                config_entry_id=self._entry_id,
+                identifiers={identifier},
+                connections={connection},
+                manufacturer=MANUFACTURER,
+                name=name,
+                model="HomeKit Bridge",
+            )
 
     @callback
-    def _async_purge_old_bridges(self, dev_reg, identifier, connection):
+    def _async_purge_old_bridges(self, dev_reg, bridge_devices):
         """Purge bridges that exist from failed pairing or manual resets."""
         devices_to_purge = []
         for entry in dev_reg.devices.values():
-            if self._entry_id in entry.config_entries and (
-                identifier not in entry.identifiers
-                or connection not in entry.connections
+            if self._entry_id in entry.config_entries and not any(
+                identifier in entry.identifiers and connection in entry.connections
+                for identifier, connection, _ in bridge_devices
             ):
                 devices_to_purge.append(entry.id)
 
         for device_id in devices_to_purge:
             dev_reg.async_remove_device(device_id)
 
-    def _start(self, bridged_states):
-        # pylint: disable=unused-import, import-outside-toplevel
-        from . import (  # noqa: F401
-            type_cameras,
-            type_covers,
-            type_custom_nest_camera,
-            type_custom_nest_camera_sensor,
-            type_custom_nest_humidifier,
-            type_custom_nest_protect,
-            type_custom_nest_temperature_sensor,
-            type_custom_nest_thermostat,
-            type_custom_smartthings_button,
-            type_custom_smartthings_motion_sensor,
-            type_custom_sony_bravia,
-            type_fans,
-            type_humidifiers,
-            type_lights,
-            type_locks,
-            type_media_players,
-            type_security_systems,
-            type_sensors,
-            type_switches,
-            type_thermostats,
-        )
-
+    def _start(self, bridged_states, aids):
         if self._homekit_mode == HOMEKIT_MODE_ACCESSORY:
             state = bridged_states[0]
             conf = self._config.pop(state.entity_id, {})
@@ -648,18 +946,25 @@ class HomeKit:
         else:
             from .accessories import HomeBridge
 
-            self.bridge = HomeBridge(self.hass, self.driver, self._name)
+            self.bridges = [
+                HomeBridge(self.hass, driver, self._shard_name(index))
+                for index, driver in enumerate(self.drivers)
+            ]
+            self.bridge = self.bridges[0]
             for state in bridged_states:
-                self.add_bridge_accessory(state)
-            self.driver.add_accessory(self.bridge)
+                self.add_bridge_accessory(state, aids[state.entity_id])
+            for driver, bridge in zip(self.drivers, self.bridges):
+                driver.add_accessory(bridge)
 
-        if not self.driver.state.paired:
+        for index, driver in enumerate(self.drivers):
+            if driver.state.paired:
+                continue
             show_setup_message(
                 self.hass,
-                self._entry_id,
-                self._name,
-                self.driver.state.pincode,
-                self.driver.accessory.xhm_uri(),
+                self.shard_ids[index],
+                self._shard_name(index),
+                driver.state.pincode,
+                driver.accessory.xhm_uri(),
             )
 
     async def async_stop(self, *args):
@@ -667,11 +972,20 @@ class HomeKit:
         if self.status != STATUS_RUNNING:
             return
         self.status = STATUS_STOPPED
-        _LOGGER.debug("Driver stop for %s", self._name)
-        await self.driver.async_stop()
+        while self._subscriptions:
+            self._subscriptions.pop(0)()
+        if self._config_changed_unsub:
+            self._config_changed_unsub()
+            self._config_changed_unsub = None
+        for driver in self.drivers:
+            _LOGGER.debug("Driver stop for %s", driver.bridge_name)
+            await driver.async_stop()
+            # Drop every route at once instead of one per accessory
+            driver.state_router.async_shutdown()
         if self.bridge:
-            for acc in self.bridge.accessories.values():
-                acc.async_stop()
+            for bridge in self.bridges:
+                for acc in bridge.accessories.values():
+                    acc.async_stop()
         else:
             self.driver.accessory.async_stop()
 
@@ -733,8 +1047,12 @@ class HomeKit:
                     current_humidity_sensor_entity_id,
                 )
 
-    async def _async_set_device_info_attributes(self, ent_reg_ent, dev_reg, entity_id):
-        """Set attributes that will be used for homekit device info."""
+    @callback
+    def _async_set_device_info_attributes(self, ent_reg_ent, dev_reg, entity_id):
+        """Set attributes that will be used for homekit device info.
+
+        Returns False if the integration name is still needed.
+        """
         ent_cfg = self._config.setdefault(entity_id, {})
         if ent_reg_ent.device_id:
             dev_reg_ent = dev_reg.async_get(ent_reg_ent.device_id)
@@ -746,14 +1064,23 @@ class HomeKit:
                     ent_cfg[ATTR_MODEL] = dev_reg_ent.model
                 if dev_reg_ent.sw_version:
                     ent_cfg[ATTR_SOFTWARE_VERSION] = dev_reg_ent.sw_version
-        if ATTR_MANUFACTURER not in ent_cfg:
-            try:
-                integration = await async_get_integration(
-                    self.hass, ent_reg_ent.platform
-                )
-                ent_cfg[ATTR_INTERGRATION] = integration.name
-            except IntegrationNotFound:
-                ent_cfg[ATTR_INTERGRATION] = ent_reg_ent.platform
+        return ATTR_MANUFACTURER in ent_cfg
+
+    async def _async_get_integration_names(self, platforms):
+        """Look up the names of all integrations in a single batch."""
+        integrations = await asyncio.gather(
+            *(async_get_integration(self.hass, platform) for platform in platforms),
+            return_exceptions=True,
+        )
+        integration_names = {}
+        for platform, integration in zip(platforms, integrations):
+            if isinstance(integration, IntegrationNotFound):
+                integration_names[platform] = platform
+            elif isinstance(integration, Exception):
+                raise integration
+            else:
+                integration_names[platform] = integration.name
+        return integration_names
 
 
 class HomeKitPairingQRView(HomeAssistantView):
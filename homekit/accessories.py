@@ -1,14 +1,29 @@
 """Custom Component"""
 
 """Extend the basic Accessory and Bridge functions."""
-from datetime import timedelta
-from functools import partial, wraps
+import asyncio
+from functools import wraps
+from importlib import import_module
 from inspect import getmodule
+import io
+import json
 import logging
+import os
+import sys
+import tempfile
+import threading
 
 from pyhap.accessory import Accessory, Bridge
-from pyhap.accessory_driver import AccessoryDriver
-from pyhap.const import CATEGORY_OTHER
+from pyhap.accessory_driver import AccessoryDriver, get_topic
+from pyhap.const import (
+    CATEGORY_OTHER,
+    HAP_REPR_ACCS,
+    HAP_REPR_AID,
+    HAP_REPR_CHARS,
+    HAP_REPR_IID,
+    HAP_REPR_SERVICES,
+    HAP_REPR_VALUE,
+)
 
 from homeassistant.components import cover, vacuum
 from homeassistant.components.cover import (
@@ -31,6 +46,7 @@ from homeassistant.const import (
     DEVICE_CLASS_HUMIDITY,
     DEVICE_CLASS_ILLUMINANCE,
     DEVICE_CLASS_TEMPERATURE,
+    EVENT_STATE_CHANGED,
     LIGHT_LUX,
     PERCENTAGE,
     STATE_ON,
@@ -39,12 +55,12 @@ from homeassistant.const import (
     TEMP_FAHRENHEIT,
     __version__,
 )
-from homeassistant.core import Context, callback as ha_callback, split_entity_id
-from homeassistant.helpers.event import (
-    async_track_state_change_event,
-    track_point_in_utc_time,
+from homeassistant.core import (
+    Context,
+    callback as ha_callback,
+    is_callback,
+    split_entity_id,
 )
-from homeassistant.util import dt as dt_util
 from homeassistant.util.decorator import Registry
 
 from .const import (
@@ -59,6 +75,7 @@ from .const import (
     CHAR_BATTERY_LEVEL,
     CHAR_CHARGING_STATE,
     CHAR_NAME,
+    CHAR_PROGRAMMABLE_SWITCH_EVENT,
     CHAR_STATUS_LOW_BATTERY,
     CONF_FEATURE_LIST,
     CONF_LINKED_BATTERY_CHARGING_SENSOR,
@@ -67,7 +84,6 @@ from .const import (
     DEVICE_CLASS_CO,
     DEVICE_CLASS_CO2,
     DEVICE_CLASS_PM25,
-    CONF_SERVICE_NAME_PREFIX,
     DEBOUNCE_TIMEOUT,
     DEFAULT_LOW_BATTERY_THRESHOLD,
     EVENT_HOMEKIT_CHANGED,
@@ -75,6 +91,7 @@ from .const import (
     HK_NOT_CHARGABLE,
     HK_NOT_CHARGING,
     MANUFACTURER,
+    SERV_ACCESSORY_INFO,
     SERV_BATTERY_SERVICE,
     TYPE_FAUCET,
     TYPE_OUTLET,
@@ -101,6 +118,7 @@ from .util import (
 )
 
 _LOGGER = logging.getLogger(__name__)
+_NOT_PUBLISHED = object()
 CUSTOM_DEVICES = {
     DEVICE_NEST_CAMERA: "NestCamera",
     DEVICE_NEST_CAMERA_SENSOR: "NestCameraSensor",
@@ -121,30 +139,80 @@ SWITCH_TYPES = {
     TYPE_VALVE: "Valve",
 }
 TYPES = Registry()
+TYPE_MODULES = {
+    "AirQualitySensor": "type_sensors",
+    "BinarySensor": "type_sensors",
+    "Camera": "type_cameras",
+    "CarbonDioxideSensor": "type_sensors",
+    "CarbonMonoxideSensor": "type_sensors",
+    "DockVacuum": "type_switches",
+    "Fan": "type_fans",
+    "GarageDoorOpener": "type_covers",
+    "HumidifierDehumidifier": "type_humidifiers",
+    "HumiditySensor": "type_sensors",
+    "Light": "type_lights",
+    "LightSensor": "type_sensors",
+    "Lock": "type_locks",
+    "MediaPlayer": "type_media_players",
+    "NestCamera": "type_custom_nest_camera",
+    "NestCameraSensor": "type_custom_nest_camera_sensor",
+    "NestHumidifier": "type_custom_nest_humidifier",
+    "NestProtect": "type_custom_nest_protect",
+    "NestTemperatureSensor": "type_custom_nest_temperature_sensor",
+    "NestThermostat": "type_custom_nest_thermostat",
+    "Outlet": "type_switches",
+    "SecuritySystem": "type_security_systems",
+    "SmartThingsButton": "type_custom_smartthings_button",
+    "SmartThingsMotionSensor": "type_custom_smartthings_motion_sensor",
+    "SonyBRAVIA": "type_custom_sony_bravia",
+    "Switch": "type_switches",
+    "TelevisionMediaPlayer": "type_media_players",
+    "TemperatureSensor": "type_sensors",
+    "Thermostat": "type_thermostats",
+    "Valve": "type_switches",
+    "WaterHeater": "type_thermostats",
+    "Window": "type_covers",
+    "WindowCovering": "type_covers",
+    "WindowCoveringBasic": "type_covers",
+}
+SUPPORTED_DOMAINS = {
+    "alarm_control_panel",
+    "automation",
+    "binary_sensor",
+    "camera",
+    "climate",
+    "cover",
+    "device_tracker",
+    "fan",
+    "humidifier",
+    "input_boolean",
+    "light",
+    "lock",
+    "media_player",
+    "person",
+    "remote",
+    "scene",
+    "script",
+    "sensor",
+    "switch",
+    "vacuum",
+    "water_heater",
+}
+
+# Stateless characteristics must notify even when the value is unchanged
+STATELESS_CHARS = {CHAR_PROGRAMMABLE_SWITCH_EVENT}
+
+# Characteristic properties of the accessory information service by name
+SHARED_INFO_PROPERTIES = {}
 
 
 def debounce(func):
     """Decorate function to debounce callbacks from HomeKit."""
 
-    @ha_callback
-    def call_later_listener(self, *args):
-        """Handle call_later callback."""
-        debounce_params = self.debounce.pop(func.__name__, None)
-        if debounce_params:
-            self.hass.async_add_executor_job(func, self, *debounce_params[1:])
-
     @wraps(func)
     def wrapper(self, *args):
-        """Start async timer."""
-        debounce_params = self.debounce.pop(func.__name__, None)
-        if debounce_params:
-            debounce_params[0]()  # remove listener
-        remove_listener = track_point_in_utc_time(
-            self.hass,
-            partial(call_later_listener, self),
-            dt_util.utcnow() + timedelta(seconds=DEBOUNCE_TIMEOUT),
-        )
-        self.debounce[func.__name__] = (remove_listener, *args)
+        """Schedule the call on the trailing edge."""
+        self.driver.debouncer.schedule(self, func, args)
         logger.debug(
             "%s: Start %s timeout", self.entity_id, func.__name__.replace("set_", "")
         )
@@ -154,6 +222,127 @@ def debounce(func):
     return wrapper
 
 
+class DebounceScheduler:
+    """Run debounced HomeKit setters on the trailing edge in the event loop.
+
+    Calls are keyed per accessory and setter, so a burst of writes to the
+    same characteristic only runs the setter once with the latest value.
+    """
+
+    def __init__(self, hass):
+        """Initialize a DebounceScheduler object."""
+        self.hass = hass
+        self._pending = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def schedule(self, acc, func, args):
+        """Schedule a setter call, can be called from any thread."""
+        self.hass.loop.call_soon_threadsafe(self.async_schedule, acc, func, args)
+
+    @ha_callback
+    def async_schedule(self, acc, func, args):
+        """Schedule a setter call, replacing any pending call."""
+        key = (acc, func.__name__)
+        self.calls += 1
+        count = 1
+        pending = self._pending.pop(key, None)
+        if pending:
+            pending[0].cancel()
+            count += pending[1]
+            self.coalesced += 1
+        handle = self.hass.loop.call_later(
+            DEBOUNCE_TIMEOUT, self._async_run, key, func, args
+        )
+        self._pending[key] = (handle, count)
+
+    @ha_callback
+    def _async_run(self, key, func, args):
+        """Run a setter once its timeout has expired."""
+        _, count = self._pending.pop(key)
+        acc = key[0]
+        _LOGGER.debug(
+            "%s: Run %s after %d calls (%d of %d calls coalesced in total)",
+            acc.entity_id,
+            key[1],
+            count,
+            self.coalesced,
+            self.calls,
+        )
+        if asyncio.iscoroutinefunction(func):
+            self.hass.async_create_task(func(acc, *args))
+        elif is_callback(func):
+            func(acc, *args)
+        else:
+            self.hass.async_add_executor_job(func, acc, *args)
+
+    @ha_callback
+    def async_cancel(self, acc):
+        """Cancel all pending calls for an accessory."""
+        for key in [key for key in self._pending if key[0] is acc]:
+            self._pending.pop(key)[0].cancel()
+
+
+class StateRouter:
+    """Dispatch state changes to HomeKit accessories.
+
+    A single state changed listener serves every accessory of a driver,
+    the tracked entities are looked up in a dict instead of each accessory
+    registering its own listeners.
+    """
+
+    def __init__(self, hass):
+        """Initialize a StateRouter object."""
+        self.hass = hass
+        self._actions = {}
+        self._unsub = None
+
+    @property
+    def listener_count(self):
+        """Return the number of routed state listeners."""
+        return sum(len(actions) for actions in self._actions.values())
+
+    @ha_callback
+    def async_subscribe(self, entity_id, action):
+        """Route state changes of an entity to an action.
+
+        Returns a callable that removes the route.
+        """
+        self._actions.setdefault(entity_id, []).append(action)
+        if self._unsub is None:
+            self._unsub = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_dispatch
+            )
+
+        @ha_callback
+        def remove():
+            actions = self._actions.get(entity_id)
+            if actions is None or action not in actions:
+                return
+            actions.remove(action)
+            if not actions:
+                del self._actions[entity_id]
+
+        return remove
+
+    @ha_callback
+    def _async_dispatch(self, event):
+        """Call the actions routed for the changed entity."""
+        actions = self._actions.get(event.data[ATTR_ENTITY_ID])
+        if not actions:
+            return
+        for action in tuple(actions):
+            action(event)
+
+    @ha_callback
+    def async_shutdown(self):
+        """Remove all routes and the state changed listener."""
+        self._actions.clear()
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+
 def get_accessory(hass, driver, state, aid, config):
     """Take state and return an accessory object if supported."""
     if not aid:
@@ -268,7 +457,15 @@ def get_accessory(hass, driver, state, aid, config):
         return None
 
     _LOGGER.debug('Add "%s" as "%s"', state.entity_id, a_type)
-    return TYPES[a_type](hass, driver, name, state.entity_id, aid, config)
+    acc_type = get_accessory_type(a_type)
+    return acc_type(hass, driver, name, state.entity_id, aid, config)
+
+
+def get_accessory_type(a_type):
+    """Return the accessory class for a type, importing its module on demand."""
+    if a_type not in TYPES:
+        import_module(f".{TYPE_MODULES[a_type]}", __package__)
+    return TYPES[a_type]
 
 
 class HomeAccessory(Accessory):
@@ -306,18 +503,20 @@ class HomeAccessory(Accessory):
         else:
             sw_version = __version__
 
+        # Most accessories share the same info, only keep one copy of it
         self.set_info_service(
-            manufacturer=manufacturer,
-            model=model,
+            manufacturer=sys.intern(manufacturer),
+            model=sys.intern(model),
             serial_number=entity_id,
-            firmware_revision=sw_version,
+            firmware_revision=sys.intern(sw_version) if sw_version else None,
         )
+        self._share_info_properties()
 
         self.category = category
         self.entity_id = entity_id
         self.hass = hass
-        self.debounce = {}
         self._subscriptions = []
+        self._published_values = {}
         self._char_battery = None
         self._char_charging = None
         self._char_low_battery = None
@@ -369,7 +568,6 @@ class HomeAccessory(Accessory):
             CHAR_STATUS_LOW_BATTERY,
         ]
         serv_battery = self.add_preload_service(SERV_BATTERY_SERVICE, battery_chars)
-        prefix = self.config.get(CONF_SERVICE_NAME_PREFIX, self.display_name)
         serv_battery.configure_char(CHAR_NAME, value=f"{self.display_name} Battery")
         self._char_battery = serv_battery.configure_char(CHAR_BATTERY_LEVEL, value=0)
         self._char_charging = serv_battery.configure_char(
@@ -379,6 +577,20 @@ class HomeAccessory(Accessory):
             CHAR_STATUS_LOW_BATTERY, value=0,
         )
 
+    def _share_info_properties(self):
+        """Point the info characteristics at properties shared by all accessories.
+
+        The properties of the accessory information characteristics are
+        never overridden, so one dict per characteristic type is enough.
+        """
+        serv_info = self.get_service(SERV_ACCESSORY_INFO)
+        for char in serv_info.characteristics:
+            shared = SHARED_INFO_PROPERTIES.setdefault(
+                char.display_name, char.properties
+            )
+            if shared == char.properties:
+                char.properties = shared
+
     @property
     def available(self):
         """Return if accessory is available."""
@@ -399,11 +611,7 @@ class HomeAccessory(Accessory):
         """
         state = self.hass.states.get(self.entity_id)
         self.async_update_state_callback(state)
-        self._subscriptions.append(
-            async_track_state_change_event(
-                self.hass, [self.entity_id], self.async_update_event_state_callback
-            )
-        )
+        self.async_track_state(self.entity_id, self.async_update_event_state_callback)
 
         battery_charging_state = None
         battery_state = None
@@ -415,24 +623,17 @@ class HomeAccessory(Accessory):
             battery_charging_state = linked_battery_sensor_state.attributes.get(
                 ATTR_BATTERY_CHARGING
             )
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    self.hass,
-                    [self.linked_battery_sensor],
-                    self.async_update_linked_battery_callback,
-                )
+            self.async_track_state(
+                self.linked_battery_sensor, self.async_update_linked_battery_callback
             )
         elif state is not None:
             battery_state = state.attributes.get(ATTR_BATTERY_LEVEL)
         if self.linked_battery_charging_sensor:
             state = self.hass.states.get(self.linked_battery_charging_sensor)
             battery_charging_state = state and state.state == STATE_ON
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    self.hass,
-                    [self.linked_battery_charging_sensor],
-                    self.async_update_linked_battery_charging_callback,
-                )
+            self.async_track_state(
+                self.linked_battery_charging_sensor,
+                self.async_update_linked_battery_charging_callback,
             )
         elif battery_charging_state is None and state is not None:
             battery_charging_state = state.attributes.get(ATTR_BATTERY_CHARGING)
@@ -440,6 +641,13 @@ class HomeAccessory(Accessory):
         if battery_state is not None or battery_charging_state is not None:
             self.async_update_battery(battery_state, battery_charging_state)
 
+    @ha_callback
+    def async_track_state(self, entity_id, action):
+        """Call action on state changes of an entity until the accessory stops."""
+        self._subscriptions.append(
+            self.driver.state_router.async_subscribe(entity_id, action)
+        )
+
     @ha_callback
     def async_update_event_state_callback(self, event):
         """Handle state change event listener callback."""
@@ -527,24 +735,69 @@ class HomeAccessory(Accessory):
         """
         raise NotImplementedError()
 
+    def publish(self, value, sender, sender_client_addr=None):
+        """Drop characteristic notifications that would not change the value."""
+        if sender.display_name not in STATELESS_CHARS:
+            if (
+                sender_client_addr is None
+                and self._published_values.get(sender, _NOT_PUBLISHED) == value
+            ):
+                return
+            self._published_values[sender] = value
+        super().publish(value, sender, sender_client_addr)
+
     def call_service(self, domain, service, service_data, value=None):
-        """Fire event and call service for changes from HomeKit."""
-        self.hass.add_job(self.async_call_service, domain, service, service_data, value)
+        """Fire event and call service for changes from HomeKit.
+
+        Calls made while a characteristic write request is being handled are
+        merged per service and made once the request is complete. A call is
+        only merged into the previous call of the same service if they do
+        not set the same key to different values.
+        """
+        transaction = self.driver.get_write_transaction()
+        if transaction is None:
+            self.hass.add_job(
+                self.async_call_service, domain, service, service_data, value
+            )
+            return
+
+        acc_calls = transaction.setdefault(self, [])
+        for call_domain, call_service, merged_data, values in reversed(acc_calls):
+            if (call_domain, call_service) != (domain, service):
+                continue
+            if all(
+                merged_data.get(key, data_value) == data_value
+                for key, data_value in service_data.items()
+            ):
+                merged_data.update(service_data)
+                values.append(value)
+                return
+            break
+        acc_calls.append((domain, service, dict(service_data), [value]))
+
+    async def async_call_services(self, calls):
+        """Make the merged service calls of a characteristic write request."""
+        for domain, service, service_data, values in calls:
+            await self._async_call_service(domain, service, service_data, values)
 
     async def async_call_service(self, domain, service, service_data, value=None):
         """Fire event and call service for changes from HomeKit.
 
         This method must be run in the event loop.
         """
-        event_data = {
-            ATTR_ENTITY_ID: self.entity_id,
-            ATTR_DISPLAY_NAME: self.display_name,
-            ATTR_SERVICE: service,
-            ATTR_VALUE: value,
-        }
-        context = Context()
+        await self._async_call_service(domain, service, service_data, [value])
 
-        self.hass.bus.async_fire(EVENT_HOMEKIT_CHANGED, event_data, context=context)
+    async def _async_call_service(self, domain, service, service_data, values):
+        """Fire an event per value and make a single service call."""
+        context = Context()
+        for value in values:
+            event_data = {
+                ATTR_ENTITY_ID: self.entity_id,
+                ATTR_DISPLAY_NAME: self.display_name,
+                ATTR_SERVICE: service,
+                ATTR_VALUE: value,
+            }
+            self.hass.bus.async_fire(EVENT_HOMEKIT_CHANGED, event_data, context=context)
         await self.hass.services.async_call(
             domain, service, service_data, context=context
         )
@@ -554,6 +807,7 @@ class HomeAccessory(Accessory):
         """Cancel any subscriptions when the bridge is stopped."""
         while self._subscriptions:
             self._subscriptions.pop(0)()
+        self.driver.debouncer.async_cancel(self)
 
 
 class HomeBridge(Bridge):
@@ -570,6 +824,18 @@ class HomeBridge(Bridge):
         )
         self.hass = hass
 
+    def add_accessory(self, acc):
+        """Add an accessory and invalidate the cached accessory database."""
+        super().add_accessory(acc)
+        self.driver.invalidate_accessories_cache()
+
+    def remove_accessory(self, aid):
+        """Remove an accessory and invalidate the cached accessory database."""
+        acc = self.accessories.pop(aid, None)
+        if acc is not None:
+            self.driver.invalidate_accessories_cache()
+        return acc
+
     def setup_message(self):
         """Prevent print of pyhap setup message to terminal."""
 
@@ -595,6 +861,192 @@ class HomeDriver(AccessoryDriver):
         self.hass = hass
         self._entry_id = entry_id
         self._bridge_name = bridge_name
+        self._pending_events = {}
+        self._flush_scheduled = False
+        self._pending_events_lock = threading.Lock()
+        self._accessories_cache = None
+        self._accessories_version = 0
+        self._accessories_cache_lock = threading.Lock()
+        self.debouncer = DebounceScheduler(hass)
+        self.state_router = StateRouter(hass)
+        self._write_transaction = threading.local()
+        self._persist_lock = threading.Lock()
+
+    def set_characteristics(self, chars_query, client_addr):
+        """Set characteristics and merge the service calls they trigger."""
+        self._write_transaction.calls = {}
+        try:
+            result = super().set_characteristics(chars_query, client_addr)
+        finally:
+            transaction = self._write_transaction.calls
+            self._write_transaction.calls = None
+
+        for acc, calls in transaction.items():
+            self.hass.add_job(acc.async_call_services, calls)
+        return result
+
+    def get_write_transaction(self):
+        """Return the calls of the write request being handled, if any."""
+        return getattr(self._write_transaction, "calls", None)
+
+    def publish(self, data, sender_client_addr=None):
+        """Queue a characteristic event to be sent with the next batch.
+
+        Events published within the same loop iteration are sent to each
+        controller as a single HAP event. This is called from the event
+        loop and from the HAP server threads.
+        """
+        topic = get_topic(data[HAP_REPR_AID], data[HAP_REPR_IID])
+        if topic not in self.topics:
+            return
+        with self._pending_events_lock:
+            self._pending_events[topic] = (data, sender_client_addr)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.loop.call_soon_threadsafe(self.async_flush_events)
+
+    @ha_callback
+    def async_flush_events(self):
+        """Hand the queued characteristic events to the event thread.
+
+        The events are grouped per controller here, sending them blocks on
+        the sockets and is left to send_events.
+        """
+        with self._pending_events_lock:
+            self._flush_scheduled = False
+            pending_events = self._pending_events
+            self._pending_events = {}
+
+        client_events = {}
+        for topic, (data, sender_client_addr) in pending_events.items():
+            for client_addr in self.topics.get(topic, set()).copy():
+                if client_addr == sender_client_addr:
+                    continue
+                client_events.setdefault(client_addr, {})[topic] = data
+
+        if client_events:
+            self.event_queue.put(client_events)
+
+    def send_events(self):
+        """Send the batches queued by async_flush_events to the controllers.
+
+        Runs in the event thread started by pyhap. A controller that can
+        not be reached is unsubscribed from the topics of its batch.
+        """
+        while not self.loop.is_closed():
+            client_events = self.event_queue.get()
+            for client_addr, events in client_events.items():
+                bytedata = json.dumps({HAP_REPR_CHARS: list(events.values())}).encode()
+                if self.http_server.push_event(bytedata, client_addr):
+                    continue
+                _LOGGER.debug(
+                    "Could not send event to %s, probably stale socket", client_addr
+                )
+                for topic in events:
+                    self.subscribe_client_topic(client_addr, topic, False)
+
+    def get_accessories(self):
+        """Return the accessory database in HAP format.
+
+        The structure is only built after the accessories change. HAP server
+        threads serialize the result after returning, so each request gets
+        its own copy with the current characteristic values.
+        """
+        cache = self._accessories_cache
+        if cache is None:
+            version = self._accessories_version
+            cache = self._build_accessories_cache()
+            with self._accessories_cache_lock:
+                # Do not keep a database the accessories changed under
+                if version == self._accessories_version:
+                    self._accessories_cache = cache
+
+        acc_reps = []
+        for acc_rep, services in cache:
+            serv_reps = []
+            for serv_rep, chars in services:
+                char_reps = [
+                    char_rep
+                    if char is None
+                    else {**char_rep, HAP_REPR_VALUE: char.get_value()}
+                    for char_rep, char in chars
+                ]
+                serv_reps.append({**serv_rep, HAP_REPR_CHARS: char_reps})
+            acc_reps.append({**acc_rep, HAP_REPR_SERVICES: serv_reps})
+        return {HAP_REPR_ACCS: acc_reps}
+
+    def _build_accessories_cache(self):
+        """Serialize the accessories and pair each characteristic with its value.
+
+        Characteristics without a value are paired with None.
+        """
+        acc_reps = self.accessory.to_HAP()
+        if not isinstance(acc_reps, list):
+            acc_reps = [acc_reps]
+        accessories = {self.accessory.aid: self.accessory}
+        accessories.update(getattr(self.accessory, "accessories", {}))
+
+        cache = []
+        for acc_rep in acc_reps:
+            iid_manager = accessories[acc_rep[HAP_REPR_AID]].iid_manager
+            services = []
+            for serv_rep in acc_rep[HAP_REPR_SERVICES]:
+                chars = []
+                for char_rep in serv_rep[HAP_REPR_CHARS]:
+                    char = None
+                    if HAP_REPR_VALUE in char_rep:
+                        char = iid_manager.get_obj(char_rep[HAP_REPR_IID])
+                    chars.append((char_rep, char))
+                services.append((serv_rep, chars))
+            cache.append((acc_rep, services))
+        return cache
+
+    def invalidate_accessories_cache(self):
+        """Rebuild the accessory database on the next request."""
+        with self._accessories_cache_lock:
+            self._accessories_version += 1
+            self._accessories_cache = None
+
+    def persist(self):
+        """Save the driver state.
+
+        pyhap calls this from the HAP server threads on pair/unpair and
+        from the executor on config changes, never from the event loop.
+        """
+        self._write_state(self._serialize_state())
+
+    def _serialize_state(self):
+        """Return the driver state as a string."""
+        buffer = io.StringIO()
+        self.encoder.persist(buffer, self.state)
+        return buffer.getvalue()
+
+    def _write_state(self, data):
+        """Atomically replace the state file with data."""
+        with self._persist_lock:
+            tmp_filename = None
+            try:
+                with tempfile.NamedTemporaryFile(
+                    mode="w", dir=os.path.dirname(self.persist_file), delete=False
+                ) as file_handle:
+                    tmp_filename = file_handle.name
+                    file_handle.write(data)
+                os.replace(tmp_filename, self.persist_file)
+                tmp_filename = None
+            finally:
+                if tmp_filename is not None:
+                    os.remove(tmp_filename)
+
+    def config_changed(self):
+        """Invalidate the cached accessory database before notifying."""
+        self.invalidate_accessories_cache()
+        super().config_changed()
+
+    @property
+    def bridge_name(self):
+        """Return the name of the bridge served by this driver."""
+        return self._bridge_name
 
     def pair(self, client_uuid, client_public):
         """Override super function to dismiss setup message if paired."""
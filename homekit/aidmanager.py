@@ -69,7 +69,8 @@ class AccessoryAidStorage:
         """Create a new entity map store."""
         self.hass = hass
         self.allocations = {}
-        self.allocated_aids = set()
+        self.aid_to_key = {}
+        self.entity_id_to_aid = {}
         self._entry = entry
         self.store = None
         self._entity_registry = None
@@ -88,34 +89,64 @@ class AccessoryAidStorage:
             return
 
         self.allocations = raw_storage.get(ALLOCATIONS_KEY, {})
-        self.allocated_aids = set(self.allocations.values())
+        # The reverse index is derived data and is not stored
+        self.aid_to_key = {aid: key for key, aid in self.allocations.items()}
 
     def get_or_allocate_aid_for_entity_id(self, entity_id: str):
         """Generate a stable aid for an entity id."""
+        aid, allocated = self._get_or_allocate_aid_for_entity_id(entity_id)
+        if allocated:
+            self.async_schedule_save()
+        return aid
+
+    def allocate_many(self, entity_ids):
+        """Generate stable aids for many entity ids with a single save.
+
+        Returns a dict of entity id to aid.
+        """
+        aids = {}
+        any_allocated = False
+        for entity_id in entity_ids:
+            aids[entity_id], allocated = self._get_or_allocate_aid_for_entity_id(
+                entity_id
+            )
+            any_allocated |= allocated
+        if any_allocated:
+            self.async_schedule_save()
+        return aids
+
+    def get_aid_for_entity_id(self, entity_id: str):
+        """Return the aid last handed out for an entity id, if any.
+
+        This also works after the entity was removed from the entity
+        registry, when its unique id can no longer be looked up.
+        """
+        return self.entity_id_to_aid.get(entity_id)
+
+    def _get_or_allocate_aid_for_entity_id(self, entity_id: str):
+        """Return the aid for an entity id and if it was newly allocated."""
         entity = self._entity_registry.async_get(entity_id)
-        if not entity:
-            return self._get_or_allocate_aid(None, entity_id)
-
-        sys_unique_id = get_system_unique_id(entity)
-        return self._get_or_allocate_aid(sys_unique_id, entity_id)
+        sys_unique_id = get_system_unique_id(entity) if entity else None
+        aid, allocated = self._get_or_allocate_aid(sys_unique_id, entity_id)
+        self.entity_id_to_aid[entity_id] = aid
+        return aid, allocated
 
     def _get_or_allocate_aid(self, unique_id: str, entity_id: str):
         """Allocate (and return) a new aid for an accessory."""
         if unique_id and unique_id in self.allocations:
-            return self.allocations[unique_id]
+            return self.allocations[unique_id], False
         if entity_id in self.allocations:
-            return self.allocations[entity_id]
+            return self.allocations[entity_id], False
 
         for aid in _generate_aids(unique_id, entity_id):
             if aid in INVALID_AIDS:
                 continue
-            if aid not in self.allocated_aids:
+            if aid not in self.aid_to_key:
                 # Prefer the unique_id over the entitiy_id
                 storage_key = unique_id or entity_id
                 self.allocations[storage_key] = aid
-                self.allocated_aids.add(aid)
-                self.async_schedule_save()
-                return aid
+                self.aid_to_key[aid] = storage_key
+                return aid, True
 
         raise ValueError(
             f"Unable to generate unique aid allocation for {entity_id} [{unique_id}]"
@@ -127,9 +158,20 @@ class AccessoryAidStorage:
             return
 
         aid = self.allocations.pop(storage_key)
-        self.allocated_aids.discard(aid)
+        self.aid_to_key.pop(aid, None)
         self.async_schedule_save()
 
+    def delete_aids(self, aids):
+        """Delete the allocations of many aids with a single save."""
+        deleted = False
+        for aid in aids:
+            storage_key = self.aid_to_key.pop(aid, None)
+            if storage_key is not None:
+                self.allocations.pop(storage_key, None)
+                deleted = True
+        if deleted:
+            self.async_schedule_save()
+
     @callback
     def async_schedule_save(self):
         """Schedule saving the entity map cache."""
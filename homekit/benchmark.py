@@ -0,0 +1,342 @@
+"""Benchmark the HomeKit bridge with synthetic entities.
+
+Runs entirely offline against a throwaway Home Assistant instance in a
+temporary config directory. From the directory containing
+custom_components run:
+
+    python -m custom_components.homekit.benchmark --entities 100 1000 5000
+
+Each run reports wall time, CPU time and traced memory for starting the
+bridge, constructing accessories per type, fanning out state changes,
+serializing the HAP accessory database and scaling camera snapshots.
+Cameras are not part of the synthetic entities since they need ffmpeg
+and a stream source.
+"""
+import argparse
+import asyncio
+from collections import namedtuple
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from zeroconf import InterfaceChoice, Zeroconf
+
+from homeassistant.config_entries import ConfigEntries
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry
+from homeassistant.helpers.entityfilter import generate_filter
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.setup import async_setup_component
+
+from . import HomeKit
+from .accessories import get_accessory
+from .aidmanager import AccessoryAidStorage
+from .const import AID_STORAGE, DOMAIN, HOMEKIT_MODE_BRIDGE
+from .img_util import TurboJPEGSingleton, scale_jpeg_camera_image
+from .util import find_next_available_port
+
+DEFAULT_ENTITY_COUNTS = [100, 1000, 5000]
+BENCHMARK_ENTRY_ID = "benchmark"
+SNAPSHOT_SOURCE_SIZE = (1920, 1080)
+SNAPSHOT_SIZES = [(1280, 720), (640, 360), (320, 240)]
+SNAPSHOT_ROUNDS = 20
+
+# domain, state, changed state, attributes
+SYNTHETIC_ENTITIES = [
+    ("alarm_control_panel", "disarmed", "armed_away", {}),
+    ("binary_sensor", "off", "on", {"device_class": "motion"}),
+    (
+        "climate",
+        "heat",
+        "cool",
+        {
+            "hvac_modes": ["off", "heat", "cool", "auto"],
+            "current_temperature": 20,
+            "temperature": 21,
+            "min_temp": 7,
+            "max_temp": 35,
+            "supported_features": 1,
+        },
+    ),
+    ("cover", "open", "closed", {"supported_features": 15, "current_position": 50}),
+    ("device_tracker", "home", "not_home", {}),
+    (
+        "fan",
+        "on",
+        "off",
+        {"supported_features": 1, "speed_list": ["off", "low", "high"], "speed": "low"},
+    ),
+    (
+        "humidifier",
+        "on",
+        "off",
+        {"humidity": 50, "min_humidity": 0, "max_humidity": 100},
+    ),
+    ("input_boolean", "on", "off", {}),
+    (
+        "light",
+        "on",
+        "off",
+        {"supported_features": 17, "brightness": 128, "hs_color": [30, 50]},
+    ),
+    ("lock", "locked", "unlocked", {}),
+    ("media_player", "on", "off", {"device_class": "tv", "supported_features": 0}),
+    ("person", "home", "not_home", {}),
+    (
+        "sensor",
+        "21.5",
+        "22.5",
+        {"device_class": "temperature", "unit_of_measurement": "°C"},
+    ),
+    ("sensor", "45", "55", {"device_class": "humidity", "unit_of_measurement": "%"}),
+    (
+        "sensor",
+        "300",
+        "400",
+        {"device_class": "illuminance", "unit_of_measurement": "lx"},
+    ),
+    ("switch", "on", "off", {}),
+    ("vacuum", "docked", "cleaning", {"supported_features": 8192 | 16}),
+    (
+        "water_heater",
+        "eco",
+        "electric",
+        {"temperature": 50, "current_temperature": 48, "min_temp": 30, "max_temp": 60},
+    ),
+]
+
+Measurement = namedtuple("Measurement", ("name", "count", "wall", "cpu", "memory"))
+Image = namedtuple("Image", ("content_type", "content"))
+
+
+class Timer:
+    """Measure wall time, CPU time and traced memory of a block."""
+
+    def __init__(self, results, name, count=1):
+        """Initialize a Timer object."""
+        self._results = results
+        self._name = name
+        self._count = count
+        self._start = None
+
+    def __enter__(self):
+        """Start measuring."""
+        self._start = (
+            time.perf_counter(),
+            time.process_time(),
+            tracemalloc.get_traced_memory()[0],
+        )
+        return self
+
+    def __exit__(self, *args):
+        """Record the measurement."""
+        wall, cpu, memory = self._start
+        self._results.append(
+            Measurement(
+                self._name,
+                self._count,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                tracemalloc.get_traced_memory()[0] - memory,
+            )
+        )
+
+
+def _synthetic_entities(count):
+    """Return entity ids, states and changed states for count entities."""
+    entities = []
+    for index in range(count):
+        domain, state, changed, attributes = SYNTHETIC_ENTITIES[
+            index % len(SYNTHETIC_ENTITIES)
+        ]
+        entity_id = f"{domain}.benchmark_{index}"
+        entities.append((entity_id, state, changed, attributes))
+    return entities
+
+
+async def _async_setup_hass(config_dir, entities):
+    """Create a Home Assistant instance with the synthetic entities."""
+    hass = HomeAssistant()
+    hass.config.config_dir = config_dir
+    hass.config.skip_pip = True
+    os.makedirs(hass.config.path(STORAGE_DIR))
+    hass.config_entries = ConfigEntries(hass, {})
+    await async_setup_component(hass, "persistent_notification", {})
+
+    ent_reg = await entity_registry.async_get_registry(hass)
+    for entity_id, state, _, attributes in entities:
+        domain, object_id = entity_id.split(".", 1)
+        ent_reg.async_get_or_create(
+            domain, DOMAIN, object_id, suggested_object_id=object_id
+        )
+        hass.states.async_set(entity_id, state, attributes)
+    return hass
+
+
+async def _async_run(count, shards):
+    """Run all benchmarks for a number of entities."""
+    # pylint: disable=protected-access
+    results = []
+    entities = _synthetic_entities(count)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _async_setup_hass(config_dir, entities)
+        zeroconf_instance = Zeroconf(interfaces=InterfaceChoice.Default)
+
+        aid_storage = AccessoryAidStorage(hass, BENCHMARK_ENTRY_ID)
+        await aid_storage.async_initialize()
+        ports = []
+        for _ in range(shards):
+            ports.append(find_next_available_port(51827, ports))
+        homekit = HomeKit(
+            hass,
+            "Benchmark",
+            ports[0],
+            "127.0.0.1",
+            generate_filter([], [], [], []),
+            {},
+            False,
+            HOMEKIT_MODE_BRIDGE,
+            entry_id=BENCHMARK_ENTRY_ID,
+            shards=shards,
+            shard_ports=ports[1:],
+        )
+        hass.data[DOMAIN] = {BENCHMARK_ENTRY_ID: {AID_STORAGE: aid_storage}}
+        await hass.async_add_executor_job(homekit.setup, zeroconf_instance)
+
+        with Timer(results, "start bridge", count):
+            await homekit._async_create_accessories()
+
+        accessories = [
+            acc for bridge in homekit.bridges for acc in bridge.accessories.values()
+        ]
+        _benchmark_construction(results, hass, homekit, aid_storage, entities)
+
+        with Timer(results, "subscribe state changes", len(accessories)):
+            for acc in accessories:
+                await acc.run_handler()
+        await hass.async_block_till_done()
+
+        routes = sum(driver.state_router.listener_count for driver in homekit.drivers)
+        bus_listeners = hass.bus.async_listeners().get(EVENT_STATE_CHANGED, 0)
+
+        with Timer(results, "state change fan-out", count):
+            for entity_id, _, changed, attributes in entities:
+                hass.states.async_set(entity_id, changed, attributes)
+            await hass.async_block_till_done()
+
+        _benchmark_serialization(results, homekit)
+        _benchmark_snapshots(results)
+
+        for driver in homekit.drivers:
+            driver.state_router.async_shutdown()
+        for acc in accessories:
+            acc.async_stop()
+        await aid_storage.async_save()
+        await hass.async_stop()
+        zeroconf_instance.close()
+
+    _print_results(count, len(accessories), routes, bus_listeners, results)
+
+
+def _benchmark_construction(results, hass, homekit, aid_storage, entities):
+    """Time accessory construction and its memory, grouped by accessory type."""
+    by_type = {}
+    # Keep the accessories alive so their memory stays traced
+    accessories = []
+    for entity_id, _, _, _ in entities:
+        state = hass.states.get(entity_id)
+        aid = aid_storage.get_or_allocate_aid_for_entity_id(entity_id)
+        start = (
+            time.perf_counter(),
+            time.process_time(),
+            tracemalloc.get_traced_memory()[0],
+        )
+        acc = get_accessory(hass, homekit.driver, state, aid, {})
+        if acc is None:
+            continue
+        accessories.append(acc)
+        totals = by_type.setdefault(type(acc).__name__, [0, 0, 0, 0])
+        totals[0] += 1
+        totals[1] += time.perf_counter() - start[0]
+        totals[2] += time.process_time() - start[1]
+        totals[3] += tracemalloc.get_traced_memory()[0] - start[2]
+
+    for name, (count, wall, cpu, memory) in sorted(by_type.items()):
+        results.append(Measurement(f"construct {name}", count, wall, cpu, memory))
+
+
+def _benchmark_serialization(results, homekit):
+    """Time building the HAP accessory database, cold and cached."""
+    for driver in homekit.drivers:
+        driver.invalidate_accessories_cache()
+    with Timer(results, "serialize accessories (cold)", len(homekit.drivers)):
+        for driver in homekit.drivers:
+            json.dumps(driver.get_accessories())
+    with Timer(results, "serialize accessories (cached)", len(homekit.drivers)):
+        for driver in homekit.drivers:
+            json.dumps(driver.get_accessories())
+
+
+def _benchmark_snapshots(results):
+    """Time scaling a full HD snapshot to the sizes HomeKit requests."""
+    turbo_jpeg = TurboJPEGSingleton.instance()
+    if not turbo_jpeg:
+        logging.warning("TurboJPEG is not available, skipping snapshot scaling")
+        return
+
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    width, height = SNAPSHOT_SOURCE_SIZE
+    pixels = numpy.random.randint(0, 255, (height, width, 3), dtype=numpy.uint8)
+    image = Image("image/jpeg", turbo_jpeg.encode(pixels))
+    for width, height in SNAPSHOT_SIZES:
+        with Timer(results, f"scale snapshot to {width}x{height}", SNAPSHOT_ROUNDS):
+            for _ in range(SNAPSHOT_ROUNDS):
+                scale_jpeg_camera_image(image, width, height)
+
+
+def _print_results(count, accessories, routes, bus_listeners, results):
+    """Print a report of one run."""
+    print(f"\n{count} entities, {accessories} accessories")
+    print(
+        f"{routes} routed state listeners served by "
+        f"{bus_listeners} state_changed bus listeners"
+    )
+    print(
+        f"{'benchmark':<40}{'n':>7}{'wall ms':>11}{'cpu ms':>11}"
+        f"{'per item us':>13}{'memory KiB':>12}{'per item KiB':>14}"
+    )
+    for result in results:
+        print(
+            f"{result.name:<40}{result.count:>7}{result.wall * 1000:>11.1f}"
+            f"{result.cpu * 1000:>11.1f}"
+            f"{result.wall * 1e6 / max(result.count, 1):>13.1f}"
+            f"{result.memory / 1024:>12.1f}"
+            f"{result.memory / 1024 / max(result.count, 1):>14.2f}"
+        )
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--entities", type=int, nargs="+", default=DEFAULT_ENTITY_COUNTS
+    )
+    parser.add_argument("--shards", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    for count in args.entities:
+        tracemalloc.start()
+        asyncio.run(_async_run(count, args.shards))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"peak traced memory: {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
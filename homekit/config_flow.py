@@ -33,7 +33,7 @@ from .const import (
     VIDEO_CODEC_COPY,
 )
 from .const import DOMAIN  # pylint:disable=unused-import
-from .util import find_next_available_port
+from .util import find_next_available_port, get_entry_ports
 
 CONF_CAMERA_COPY = "camera_copy"
 CONF_INCLUDE_EXCLUDE_MODE = "include_exclude_mode"
@@ -149,8 +149,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def _async_available_port(self):
         """Return an available port the bridge."""
+        used_ports = {
+            port
+            for entry in self._async_current_entries()
+            for port in get_entry_ports(entry)
+        }
         return await self.hass.async_add_executor_job(
-            find_next_available_port, DEFAULT_CONFIG_FLOW_PORT
+            find_next_available_port, DEFAULT_CONFIG_FLOW_PORT, used_ports
         )
 
     @callback
@@ -11,6 +11,7 @@ HOMEKIT_FILE = ".homekit.state"
 HOMEKIT_PAIRING_QR = "homekit-pairing-qr"
 HOMEKIT_PAIRING_QR_SECRET = "homekit-pairing-qr-secret"
 HOMEKIT = "homekit"
+LINKED_DEVICE_INDEX = "homekit_linked_device_index"
 UNDO_UPDATE_LISTENER = "undo_update_listener"
 SHUTDOWN_TIMEOUT = 30
 CONF_ENTRY_INDEX = "index"
@@ -60,10 +61,13 @@ CONF_MAX_HEIGHT = "max_height"
 CONF_MAX_WIDTH = "max_width"
 CONF_SAFE_MODE = "safe_mode"
 CONF_SERVICE_NAME_PREFIX = "service_name_prefix"
+CONF_SHARD_PORTS = "shard_ports"
+CONF_SHARDS = "shards"
 CONF_SOURCE = "source"
 CONF_SOURCE_CONFIG = "source_config"
 CONF_STREAM_ADDRESS = "stream_address"
 CONF_STREAM_COUNT = "stream_count"
+CONF_STREAM_PASSTHROUGH = "stream_passthrough"
 CONF_STREAM_SOURCE = "stream_source"
 CONF_SUPPORT_AUDIO = "support_audio"
 CONF_VIDEO_CODEC = "video_codec"
@@ -84,10 +88,12 @@ DEFAULT_MAX_WIDTH = 1920
 DEFAULT_PORT = 51827
 DEFAULT_CONFIG_FLOW_PORT = 51828
 DEFAULT_SAFE_MODE = False
+DEFAULT_SHARDS = 1
 DEFAULT_VIDEO_CODEC = VIDEO_CODEC_LIBX264
 DEFAULT_VIDEO_MAP = "0:v:0"
 DEFAULT_VIDEO_PACKET_SIZE = 1316
 DEFAULT_STREAM_COUNT = 3
+DEFAULT_STREAM_PASSTHROUGH = False
 
 # #### Features ####
 FEATURE_ON_OFF = "on_off"
@@ -0,0 +1,185 @@
+"""Stream source probing for HomeKit cameras."""
+
+import asyncio
+from collections import namedtuple
+import logging
+import re
+import shlex
+
+_LOGGER = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = 10
+
+VIDEO_PROFILE_RANKS = {
+    "constrained baseline": 0,
+    "baseline": 0,
+    "main": 1,
+    "high": 2,
+}
+PASSTHROUGH_PIX_FMTS = ("yuv420p", "yuvj420p")
+
+# Max frame size (macroblocks) and max macroblock rate per level,
+# indexed by the HomeKit level id (3.1, 3.2, 4.0).
+H264_LEVEL_LIMITS = [(3600, 108000), (5120, 216000), (8192, 245760)]
+
+HK_AUDIO_CODEC_OPUS = 3
+
+RE_STREAM = re.compile(r"Stream #\d+:\d+.*?: (Video|Audio): (.*)")
+RE_RESOLUTION = re.compile(r"^(\d+)x(\d+)")
+RE_FPS = re.compile(r"^([\d.]+) fps$")
+RE_BITRATE = re.compile(r"^(\d+) kb/s")
+RE_SAMPLE_RATE = re.compile(r"^(\d+) Hz$")
+
+VideoInfo = namedtuple(
+    "VideoInfo", ("codec", "profile", "pix_fmt", "width", "height", "fps", "bitrate")
+)
+VideoInfo.__doc__ += """ Video stream parameters reported by ffmpeg."""
+
+AudioInfo = namedtuple("AudioInfo", ("codec", "sample_rate", "channels"))
+AudioInfo.__doc__ += """ Audio stream parameters reported by ffmpeg."""
+
+SourceInfo = namedtuple("SourceInfo", ("video", "audio"))
+SourceInfo.__doc__ += """ First video and audio stream found in a source."""
+
+
+def _split_stream_fields(description):
+    """Split an ffmpeg stream description on commas outside of parentheses."""
+    fields = []
+    depth = 0
+    current = ""
+    for char in description:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            fields.append(current.strip())
+            current = ""
+            continue
+        current += char
+    fields.append(current.strip())
+    return fields
+
+
+def _parse_video(fields):
+    """Parse the fields of an ffmpeg video stream line."""
+    codec_field = fields[0].split(" ", 1)
+    codec = codec_field[0]
+    profile = None
+    if len(codec_field) > 1 and codec_field[1].startswith("("):
+        profile = codec_field[1][1:].split(")", 1)[0].lower()
+    pix_fmt = fields[1].split("(", 1)[0] if len(fields) > 1 else None
+    width = height = fps = bitrate = None
+    for field in fields[2:]:
+        match = RE_RESOLUTION.match(field)
+        if match and width is None:
+            width, height = int(match.group(1)), int(match.group(2))
+            continue
+        match = RE_FPS.match(field)
+        if match:
+            fps = float(match.group(1))
+            continue
+        match = RE_BITRATE.match(field)
+        if match:
+            bitrate = int(match.group(1))
+    return VideoInfo(codec, profile, pix_fmt, width, height, fps, bitrate)
+
+
+def _parse_audio(fields):
+    """Parse the fields of an ffmpeg audio stream line."""
+    codec = fields[0].split(" ", 1)[0]
+    sample_rate = None
+    channels = None
+    for field in fields[1:]:
+        match = RE_SAMPLE_RATE.match(field)
+        if match:
+            sample_rate = int(match.group(1))
+        elif field == "mono":
+            channels = 1
+        elif field == "stereo":
+            channels = 2
+    return AudioInfo(codec, sample_rate, channels)
+
+
+def parse_source_info(output):
+    """Extract the first video and audio stream from ffmpeg -i output."""
+    video = audio = None
+    for line in output.splitlines():
+        match = RE_STREAM.search(line)
+        if not match:
+            continue
+        fields = _split_stream_fields(match.group(2))
+        if match.group(1) == "Video" and video is None:
+            video = _parse_video(fields)
+        elif match.group(1) == "Audio" and audio is None:
+            audio = _parse_audio(fields)
+    return SourceInfo(video, audio)
+
+
+async def async_probe_source(binary, input_source):
+    """Run ffmpeg against the input source and return its stream parameters."""
+    cmd = [binary, "-hide_banner", *shlex.split(input_source)]
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError:
+        _LOGGER.exception("Failed to run ffmpeg to probe stream source")
+        return None
+
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), PROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        _LOGGER.warning("Timed out probing stream source")
+        return None
+
+    info = parse_source_info(stderr.decode(errors="replace"))
+    _LOGGER.debug("Probed stream source: %s", info)
+    return info
+
+
+def video_can_passthrough(video, stream_config):
+    """Determine if a video stream already satisfies the negotiated config."""
+    if video is None or video.codec != "h264" or video.width is None:
+        return False
+    if video.pix_fmt not in PASSTHROUGH_PIX_FMTS:
+        return False
+
+    profile_rank = VIDEO_PROFILE_RANKS.get(video.profile)
+    profile_id = int.from_bytes(stream_config["v_profile_id"], byteorder="big")
+    if profile_rank is None or profile_rank > profile_id:
+        return False
+
+    if video.width > stream_config["width"] or video.height > stream_config["height"]:
+        return False
+    fps = video.fps or stream_config["fps"]
+    if fps > stream_config["fps"]:
+        return False
+    if video.bitrate and video.bitrate > stream_config["v_max_bitrate"]:
+        return False
+
+    # ffmpeg does not report the level, so derive it from the frame size and rate
+    level = int.from_bytes(stream_config["v_level"], byteorder="big")
+    max_frame_size, max_mb_rate = H264_LEVEL_LIMITS[
+        min(level, len(H264_LEVEL_LIMITS) - 1)
+    ]
+    frame_size = ((video.width + 15) // 16) * ((video.height + 15) // 16)
+    return frame_size <= max_frame_size and frame_size * fps <= max_mb_rate
+
+
+def audio_can_passthrough(audio, stream_config):
+    """Determine if an audio stream already satisfies the negotiated config."""
+    if audio is None or audio.codec != "opus":
+        return False
+    codec = int.from_bytes(stream_config.get("a_codec", b""), byteorder="big")
+    if codec != HK_AUDIO_CODEC_OPUS:
+        return False
+    return (
+        audio.channels == stream_config.get("a_channel")
+        and audio.sample_rate == stream_config.get("a_sample_rate", 0) * 1000
+    )
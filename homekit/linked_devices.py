@@ -0,0 +1,100 @@
+"""Index of the sensors HomeKit links to accessories of the same device."""
+from homeassistant.components.binary_sensor import (
+    DEVICE_CLASS_BATTERY_CHARGING,
+    DEVICE_CLASS_MOTION,
+    DEVICE_CLASS_OCCUPANCY,
+    DOMAIN as BINARY_SENSOR_DOMAIN,
+)
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.const import DEVICE_CLASS_BATTERY, DEVICE_CLASS_HUMIDITY
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_registry import (
+    EVENT_ENTITY_REGISTRY_UPDATED,
+    EntityRegistry,
+)
+
+from .const import LINKED_DEVICE_INDEX
+
+LINKED_DEVICE_CLASSES = {
+    (BINARY_SENSOR_DOMAIN, DEVICE_CLASS_BATTERY_CHARGING),
+    (BINARY_SENSOR_DOMAIN, DEVICE_CLASS_MOTION),
+    (BINARY_SENSOR_DOMAIN, DEVICE_CLASS_OCCUPANCY),
+    (SENSOR_DOMAIN, DEVICE_CLASS_BATTERY),
+    (SENSOR_DOMAIN, DEVICE_CLASS_HUMIDITY),
+}
+
+
+@callback
+def async_get_linked_device_index(hass: HomeAssistant, ent_reg: EntityRegistry):
+    """Return the index shared by every HomeKit bridge, creating it if needed."""
+    index = hass.data.get(LINKED_DEVICE_INDEX)
+    if index is None:
+        index = hass.data[LINKED_DEVICE_INDEX] = LinkedDeviceIndex(hass, ent_reg)
+    return index
+
+
+@callback
+def async_remove_linked_device_index(hass: HomeAssistant):
+    """Stop tracking the entity registry once no bridge is left."""
+    index = hass.data.pop(LINKED_DEVICE_INDEX, None)
+    if index is not None:
+        index.async_shutdown()
+
+
+class LinkedDeviceIndex:
+    """Map device ids to the linkable sensors that belong to them.
+
+    The index is built from the entity registry once and then kept up to
+    date from registry events instead of being rebuilt on every start.
+    """
+
+    def __init__(self, hass: HomeAssistant, ent_reg: EntityRegistry):
+        """Build the index from the entity registry."""
+        self._ent_reg = ent_reg
+        self.lookup = ent_reg.async_get_device_class_lookup(LINKED_DEVICE_CLASSES)
+        self._entity_keys = {
+            entity_id: (device_id, key)
+            for device_id, classes in self.lookup.items()
+            for key, entity_id in classes.items()
+        }
+        self._unsub = hass.bus.async_listen(
+            EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_registry_updated
+        )
+
+    @callback
+    def async_shutdown(self):
+        """Stop listening for entity registry changes."""
+        self._unsub()
+
+    @callback
+    def _async_handle_registry_updated(self, event):
+        """Apply a single entity registry change to the index."""
+        entity_id = event.data["entity_id"]
+        self._async_remove(event.data.get("old_entity_id", entity_id))
+        self._async_remove(entity_id)
+        if event.data["action"] != "remove":
+            self._async_add(entity_id)
+
+    @callback
+    def _async_add(self, entity_id):
+        """Index an entity if it is a linkable sensor of a device."""
+        entry = self._ent_reg.async_get(entity_id)
+        if entry is None or entry.device_id is None:
+            return
+        key = (entry.domain, entry.device_class)
+        if key not in LINKED_DEVICE_CLASSES:
+            return
+        self.lookup.setdefault(entry.device_id, {})[key] = entity_id
+        self._entity_keys[entity_id] = (entry.device_id, key)
+
+    @callback
+    def _async_remove(self, entity_id):
+        """Drop an entity from the index."""
+        if entity_id not in self._entity_keys:
+            return
+        device_id, key = self._entity_keys.pop(entity_id)
+        classes = self.lookup[device_id]
+        if classes.get(key) == entity_id:
+            del classes[key]
+        if not classes:
+            del self.lookup[device_id]
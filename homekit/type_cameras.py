@@ -2,6 +2,7 @@
 import asyncio
 from datetime import timedelta
 import logging
+import time
 
 from haffmpeg.core import HAFFmpeg
 from pyhap.camera import (
@@ -14,14 +15,13 @@ from pyhap.const import CATEGORY_CAMERA
 from homeassistant.components.ffmpeg import DATA_FFMPEG
 from homeassistant.const import STATE_ON
 from homeassistant.core import callback
-from homeassistant.helpers.event import (
-    async_track_state_change_event,
-    async_track_time_interval,
-)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.util import get_local_ip
 
 from .accessories import TYPES, HomeAccessory
 from .const import (
+    AUDIO_CODEC_COPY,
     CHAR_MOTION_DETECTED,
     CHAR_MUTE,
     CHAR_PROGRAMMABLE_SWITCH_EVENT,
@@ -35,6 +35,7 @@ from .const import (
     CONF_MAX_WIDTH,
     CONF_STREAM_ADDRESS,
     CONF_STREAM_COUNT,
+    CONF_STREAM_PASSTHROUGH,
     CONF_STREAM_SOURCE,
     CONF_SUPPORT_AUDIO,
     CONF_VIDEO_CODEC,
@@ -47,6 +48,7 @@ from .const import (
     DEFAULT_MAX_HEIGHT,
     DEFAULT_MAX_WIDTH,
     DEFAULT_STREAM_COUNT,
+    DEFAULT_STREAM_PASSTHROUGH,
     DEFAULT_SUPPORT_AUDIO,
     DEFAULT_VIDEO_CODEC,
     DEFAULT_VIDEO_MAP,
@@ -55,6 +57,12 @@ from .const import (
     SERV_MOTION_SENSOR,
     SERV_SPEAKER,
     SERV_STATELESS_PROGRAMMABLE_SWITCH,
+    VIDEO_CODEC_COPY,
+)
+from .ffmpeg_util import (
+    async_probe_source,
+    audio_can_passthrough,
+    video_can_passthrough,
 )
 from .img_util import scale_jpeg_camera_image
 from .util import pid_is_alive
@@ -68,10 +76,7 @@ DOORBELL_LONG_PRESS = 2
 VIDEO_OUTPUT = (
     "-map {v_map} -an "
     "-c:v {v_codec} "
-    "{v_profile}"
-    "-tune zerolatency -pix_fmt yuv420p "
-    "-r {fps} "
-    "-b:v {v_max_bitrate}k -bufsize {v_bufsize}k -maxrate {v_max_bitrate}k "
+    "{v_encode}"
     "-payload_type 99 "
     "-ssrc {v_ssrc} -f rtp "
     "-srtp_out_suite AES_CM_128_HMAC_SHA1_80 -srtp_out_params {v_srtp_key} "
@@ -82,9 +87,7 @@ VIDEO_OUTPUT = (
 AUDIO_OUTPUT = (
     "-map {a_map} -vn "
     "-c:a {a_encoder} "
-    "{a_application}"
-    "-ac 1 -ar {a_sample_rate}k "
-    "-b:a {a_max_bitrate}k -bufsize {a_bufsize}k "
+    "{a_encode}"
     "-payload_type 110 "
     "-ssrc {a_ssrc} -f rtp "
     "-srtp_out_suite AES_CM_128_HMAC_SHA1_80 -srtp_out_params {a_srtp_key} "
@@ -92,6 +95,19 @@ AUDIO_OUTPUT = (
     "localrtcpport={a_port}&pkt_size={a_pkt_size}"
 )
 
+VIDEO_ENCODE = (
+    "{v_profile}"
+    "-tune zerolatency -pix_fmt yuv420p "
+    "-r {fps} "
+    "-b:v {v_max_bitrate}k -bufsize {v_bufsize}k -maxrate {v_max_bitrate}k "
+)
+
+AUDIO_ENCODE = (
+    "{a_application}"
+    "-ac 1 -ar {a_sample_rate}k "
+    "-b:a {a_max_bitrate}k -bufsize {a_bufsize}k "
+)
+
 SLOW_RESOLUTIONS = [
     (320, 180, 15),
     (320, 240, 15),
@@ -119,6 +135,11 @@ FFMPEG_WATCHER = "ffmpeg_watcher"
 FFMPEG_PID = "ffmpeg_pid"
 SESSION_ID = "session_id"
 
+# Seconds a snapshot fetched on motion or a doorbell press is served for
+SNAPSHOT_PREFETCH_TTL = 10
+# Seconds before a stream source that could not be probed is probed again
+SOURCE_PROBE_RETRY_DELAY = 60
+
 CONFIG_DEFAULTS = {
     CONF_SUPPORT_AUDIO: DEFAULT_SUPPORT_AUDIO,
     CONF_MAX_WIDTH: DEFAULT_MAX_WIDTH,
@@ -131,6 +152,7 @@ CONFIG_DEFAULTS = {
     CONF_AUDIO_PACKET_SIZE: DEFAULT_AUDIO_PACKET_SIZE,
     CONF_VIDEO_PACKET_SIZE: DEFAULT_VIDEO_PACKET_SIZE,
     CONF_STREAM_COUNT: DEFAULT_STREAM_COUNT,
+    CONF_STREAM_PASSTHROUGH: DEFAULT_STREAM_PASSTHROUGH,
 }
 
 
@@ -141,6 +163,11 @@ class Camera(HomeAccessory, PyhapCamera):
     def __init__(self, hass, driver, name, entity_id, aid, config):
         """Initialize a Camera accessory object."""
         self._ffmpeg = hass.data[DATA_FFMPEG]
+        self._source_info = None
+        self._source_info_input = None
+        self._source_probe_failed = None
+        self._snapshot = None
+        self._snapshot_task = None
         for config_key in CONFIG_DEFAULTS:
             if config_key not in config:
                 config[config_key] = CONFIG_DEFAULTS[config_key]
@@ -245,17 +272,13 @@ class Camera(HomeAccessory, PyhapCamera):
         Run inside the Home Assistant event loop.
         """
         if self._char_motion_detected:
-            async_track_state_change_event(
-                self.hass,
-                [self.linked_motion_sensor],
-                self._async_update_motion_state_event,
+            self.async_track_state(
+                self.linked_motion_sensor, self._async_update_motion_state_event
             )
 
         if self._char_doorbell_detected:
-            async_track_state_change_event(
-                self.hass,
-                [self.linked_doorbell_sensor],
-                self._async_update_doorbell_state_event,
+            self.async_track_state(
+                self.linked_doorbell_sensor, self._async_update_doorbell_state_event
             )
 
         await super().run_handler()
@@ -263,7 +286,9 @@ class Camera(HomeAccessory, PyhapCamera):
     @callback
     def _async_update_motion_state_event(self, event):
         """Handle state change event listener callback."""
-        self._async_update_motion_state(event.data.get("new_state"))
+        new_state = event.data.get("new_state")
+        self._async_update_motion_state(new_state)
+        self._async_push_event(new_state)
 
     @callback
     def _async_update_motion_state(self, new_state):
@@ -286,7 +311,9 @@ class Camera(HomeAccessory, PyhapCamera):
     @callback
     def _async_update_doorbell_state_event(self, event):
         """Handle state change event listener callback."""
-        self._async_update_doorbell_state(event.data.get("new_state"))
+        new_state = event.data.get("new_state")
+        self._async_update_doorbell_state(new_state)
+        self._async_push_event(new_state)
 
     @callback
     def _async_update_doorbell_state(self, new_state):
@@ -304,6 +331,47 @@ class Camera(HomeAccessory, PyhapCamera):
                 DOORBELL_SINGLE_PRESS,
             )
 
+    @callback
+    def _async_push_event(self, new_state):
+        """Send motion and doorbell events without waiting for the next batch.
+
+        When the sensor triggers, a snapshot is fetched right away so the
+        notification thumbnail requested by the controllers is ready.
+        """
+        self.driver.async_flush_events()
+        if new_state and new_state.state == STATE_ON:
+            self._async_prefetch_snapshot()
+
+    @callback
+    def _async_prefetch_snapshot(self):
+        """Start fetching a snapshot unless one is already on its way."""
+        if self._snapshot_task is None:
+            self._snapshot_task = self.hass.async_create_task(
+                self._async_fetch_snapshot()
+            )
+
+    async def _async_fetch_snapshot(self):
+        """Fetch a snapshot and keep it for the notification thumbnail."""
+        try:
+            image = await self.hass.components.camera.async_get_image(self.entity_id)
+        except HomeAssistantError as err:
+            _LOGGER.debug("%s: Failed to prefetch snapshot: %s", self.entity_id, err)
+        else:
+            self._snapshot = (time.monotonic(), image)
+        finally:
+            self._snapshot_task = None
+
+    async def _async_get_snapshot_image(self):
+        """Return a camera image, reusing a recently prefetched one."""
+        if self._snapshot_task is not None:
+            await self._snapshot_task
+        if (
+            self._snapshot is not None
+            and time.monotonic() - self._snapshot[0] < SNAPSHOT_PREFETCH_TTL
+        ):
+            return self._snapshot[1]
+        return await self.hass.components.camera.async_get_image(self.entity_id)
+
     @callback
     def async_update_state(self, new_state):
         """Handle state change to update HomeKit value."""
@@ -326,6 +394,31 @@ class Camera(HomeAccessory, PyhapCamera):
             self.config[CONF_STREAM_SOURCE] = stream_source
         return stream_source
 
+    async def _async_get_source_info(self, input_source):
+        """Probe the stream source once and cache the result.
+
+        A failed probe is retried after SOURCE_PROBE_RETRY_DELAY.
+        """
+        if self._source_info_input == input_source:
+            return self._source_info
+        if (
+            self._source_probe_failed is not None
+            and self._source_probe_failed[0] == input_source
+            and time.monotonic() - self._source_probe_failed[1]
+            < SOURCE_PROBE_RETRY_DELAY
+        ):
+            return None
+
+        source_info = await async_probe_source(self._ffmpeg.binary, input_source)
+        if source_info is None:
+            self._source_probe_failed = (input_source, time.monotonic())
+            return None
+
+        self._source_probe_failed = None
+        self._source_info = source_info
+        self._source_info_input = input_source
+        return source_info
+
     async def start_stream(self, session_info, stream_config):
         """Start a new stream with the given configuration."""
         _LOGGER.debug(
@@ -339,8 +432,23 @@ class Camera(HomeAccessory, PyhapCamera):
             return False
         if "-i " not in input_source:
             input_source = "-i " + input_source
+        video_codec = self.config[CONF_VIDEO_CODEC]
+        audio_codec = self.config[CONF_AUDIO_CODEC]
+        if self.config[CONF_STREAM_PASSTHROUGH]:
+            source_info = await self._async_get_source_info(input_source)
+            if source_info:
+                if video_can_passthrough(source_info.video, stream_config):
+                    video_codec = VIDEO_CODEC_COPY
+                if audio_can_passthrough(source_info.audio, stream_config):
+                    audio_codec = AUDIO_CODEC_COPY
+            _LOGGER.debug(
+                "[%s] Selected video codec %s and audio codec %s",
+                session_info["id"],
+                video_codec,
+                audio_codec,
+            )
         video_profile = ""
-        if self.config[CONF_VIDEO_CODEC] != "copy":
+        if video_codec != VIDEO_CODEC_COPY:
             video_profile = (
                 "-profile:v "
                 + VIDEO_PROFILE_NAMES[
@@ -349,7 +457,7 @@ class Camera(HomeAccessory, PyhapCamera):
                 + " "
             )
         audio_application = ""
-        if self.config[CONF_AUDIO_CODEC] == "libopus":
+        if audio_codec == "libopus":
             audio_application = "-application lowdelay "
         output_vars = stream_config.copy()
         output_vars.update(
@@ -358,14 +466,20 @@ class Camera(HomeAccessory, PyhapCamera):
                 "v_bufsize": stream_config["v_max_bitrate"] * 4,
                 "v_map": self.config[CONF_VIDEO_MAP],
                 "v_pkt_size": self.config[CONF_VIDEO_PACKET_SIZE],
-                "v_codec": self.config[CONF_VIDEO_CODEC],
+                "v_codec": video_codec,
                 "a_bufsize": stream_config["a_max_bitrate"] * 4,
                 "a_map": self.config[CONF_AUDIO_MAP],
                 "a_pkt_size": self.config[CONF_AUDIO_PACKET_SIZE],
-                "a_encoder": self.config[CONF_AUDIO_CODEC],
+                "a_encoder": audio_codec,
                 "a_application": audio_application,
             }
         )
+        output_vars["v_encode"] = ""
+        if video_codec != VIDEO_CODEC_COPY:
+            output_vars["v_encode"] = VIDEO_ENCODE.format(**output_vars)
+        output_vars["a_encode"] = ""
+        if audio_codec != AUDIO_CODEC_COPY:
+            output_vars["a_encode"] = AUDIO_ENCODE.format(**output_vars)
         output = VIDEO_OUTPUT.format(**output_vars)
         if self.config[CONF_SUPPORT_AUDIO]:
             output = output + " " + AUDIO_OUTPUT.format(**output_vars)
@@ -448,8 +562,7 @@ class Camera(HomeAccessory, PyhapCamera):
         """Return a jpeg of a snapshot from the camera."""
         return scale_jpeg_camera_image(
             asyncio.run_coroutine_threadsafe(
-                self.hass.components.camera.async_get_image(self.entity_id),
-                self.hass.loop,
+                self._async_get_snapshot_image(), self.hass.loop
             ).result(),
             image_size["image-width"],
             image_size["image-height"],
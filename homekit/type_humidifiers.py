@@ -23,7 +23,6 @@ from homeassistant.const import (
     STATE_ON,
 )
 from homeassistant.core import callback
-from homeassistant.helpers.event import async_track_state_change_event
 
 from .accessories import TYPES, HomeAccessory
 from .const import (
@@ -149,10 +148,8 @@ class HumidifierDehumidifier(HomeAccessory):
         Run inside the Home Assistant event loop.
         """
         if self.linked_humidity_sensor:
-            async_track_state_change_event(
-                self.hass,
-                [self.linked_humidity_sensor],
-                self.async_update_current_humidity_event,
+            self.async_track_state(
+                self.linked_humidity_sensor, self.async_update_current_humidity_event
             )
 
         await super().run_handler()
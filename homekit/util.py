@@ -2,6 +2,7 @@
 
 """Collection of useful functions for the HomeKit component."""
 from collections import OrderedDict, namedtuple
+import glob
 import io
 import ipaddress
 import logging
@@ -19,6 +20,7 @@ from homeassistant.const import (
     ATTR_SUPPORTED_FEATURES,
     CONF_DEVICE,
     CONF_NAME,
+    CONF_PORT,
     CONF_TYPE,
     TEMP_CELSIUS,
 )
@@ -46,10 +48,12 @@ from .const import (
     CONF_MAX_FPS,
     CONF_MAX_HEIGHT,
     CONF_MAX_WIDTH,
+    CONF_SHARD_PORTS,
     CONF_SOURCE,
     CONF_SOURCE_CONFIG,
     CONF_STREAM_ADDRESS,
     CONF_STREAM_COUNT,
+    CONF_STREAM_PASSTHROUGH,
     CONF_STREAM_SOURCE,
     CONF_SUPPORT_AUDIO,
     CONF_VIDEO_CODEC,
@@ -66,6 +70,7 @@ from .const import (
     DEFAULT_MAX_HEIGHT,
     DEFAULT_MAX_WIDTH,
     DEFAULT_STREAM_COUNT,
+    DEFAULT_STREAM_PASSTHROUGH,
     DEFAULT_SUPPORT_AUDIO,
     DEFAULT_VIDEO_CODEC,
     DEFAULT_VIDEO_MAP,
@@ -164,6 +169,9 @@ CAMERA_SCHEMA = BASIC_INFO_SCHEMA.extend(
         vol.Optional(CONF_VIDEO_CODEC, default=DEFAULT_VIDEO_CODEC): vol.In(
             VALID_VIDEO_CODECS
         ),
+        vol.Optional(
+            CONF_STREAM_PASSTHROUGH, default=DEFAULT_STREAM_PASSTHROUGH
+        ): cv.boolean,
         vol.Optional(
             CONF_AUDIO_PACKET_SIZE, default=DEFAULT_AUDIO_PACKET_SIZE
         ): cv.positive_int,
@@ -501,6 +509,13 @@ def density_to_air_quality(density):
     return 5
 
 
+def get_shard_id(entry_id: str, index: int):
+    """Determine the id used for the state of a bridge shard."""
+    if index == 0:
+        return entry_id
+    return f"{entry_id}_{index}"
+
+
 def get_persist_filename_for_entry_id(entry_id: str):
     """Determine the filename of the homekit state file."""
     return f"{DOMAIN}.{entry_id}.state"
@@ -556,6 +571,11 @@ def remove_state_files_for_entry_id(hass: HomeAssistant, entry_id: str):
     os.unlink(persist_file_path)
     if os.path.exists(aid_storage_path):
         os.unlink(aid_storage_path)
+    shard_persist_files = glob.glob(
+        get_persist_fullpath_for_entry_id(hass, get_shard_id(entry_id, "*"))
+    )
+    for shard_persist_file_path in shard_persist_files:
+        os.unlink(shard_persist_file_path)
     return True
 
 
@@ -578,10 +598,16 @@ def port_is_available(port: int):
     return True
 
 
-def find_next_available_port(start_port: int):
-    """Find the next available port starting with the given port."""
+def find_next_available_port(start_port: int, exclude_ports=()):
+    """Find the next available port starting with the given port.
+
+    Ports in exclude_ports are skipped even if they are free, so a port
+    configured for a bridge that is not running is not handed out twice.
+    """
     test_socket = _get_test_socket()
     for port in range(start_port, MAX_PORT):
+        if port in exclude_ports:
+            continue
         try:
             test_socket.bind(("", port))
             return port
@@ -591,6 +617,11 @@ def find_next_available_port(start_port: int):
             continue
 
 
+def get_entry_ports(entry):
+    """Return the ports of the bridge and bridge shards of a config entry."""
+    return [entry.data[CONF_PORT], *entry.data.get(CONF_SHARD_PORTS, [])]
+
+
 def pid_is_alive(pid):
     """Check to see if a process is alive."""
     try: